@@ -7,6 +7,14 @@ from airflow.operators.bash import BashOperator
 from airflow.operators.python import PythonOperator
 import os
 
+# Environment variables reported by check_environment_variables
+ENV_VAR_KEYS = (
+    "POSTGRES_SERVER",
+    "POSTGRES_DB",
+    "MINIO_ENDPOINT",
+    "QDRANT_HOST",
+)
+
 
 def print_hello():
     """Simple Python function to test Airflow"""
@@ -16,16 +24,11 @@ def print_hello():
 
 def check_environment_variables():
     """Check if environment variables are accessible"""
-    import os
-    env_vars = {
-        "POSTGRES_SERVER": os.getenv("POSTGRES_SERVER"),
-        "POSTGRES_DB": os.getenv("POSTGRES_DB"),
-        "MINIO_ENDPOINT": os.getenv("MINIO_ENDPOINT"),
-        "QDRANT_HOST": os.getenv("QDRANT_HOST"),
-    }
-    print("Environment Variables:")
-    for key, value in env_vars.items():
-        print(f"  {key}: {value}")
+    env_vars = {key: os.environ.get(key) for key in ENV_VAR_KEYS}
+    print(
+        "Environment Variables:\n"
+        + "\n".join(f"  {key}: {value}" for key, value in env_vars.items())
+    )
     return env_vars
 
 
@@ -0,0 +1,27 @@
+"""Add indexes on file visible_bu_id and responsible_function_id
+
+Revision ID: a7b3d9e5c6f8
+Revises: f6a2c8d4b5e7
+Create Date: 2026-10-14
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7b3d9e5c6f8'
+down_revision = 'f6a2c8d4b5e7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(op.f('ix_file_visible_bu_id'), 'file', ['visible_bu_id'], unique=False)
+    op.create_index(op.f('ix_file_responsible_function_id'), 'file', ['responsible_function_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_file_responsible_function_id'), table_name='file')
+    op.drop_index(op.f('ix_file_visible_bu_id'), table_name='file')
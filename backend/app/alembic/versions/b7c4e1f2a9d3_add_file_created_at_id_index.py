@@ -0,0 +1,25 @@
+"""Add index on file created_at and id for keyset pagination
+
+Revision ID: b7c4e1f2a9d3
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-14
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7c4e1f2a9d3'
+down_revision = 'a1b2c3d4e5f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_file_created_at_id', 'file', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_file_created_at_id', table_name='file')
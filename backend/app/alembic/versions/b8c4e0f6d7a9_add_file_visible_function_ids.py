@@ -0,0 +1,41 @@
+"""Add denormalized visible_function_ids array to file
+
+Revision ID: b8c4e0f6d7a9
+Revises: a7b3d9e5c6f8
+Create Date: 2026-10-14
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8c4e0f6d7a9'
+down_revision = 'a7b3d9e5c6f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('file', sa.Column('visible_function_ids', postgresql.ARRAY(sa.Uuid()), server_default=sa.text("'{}'"), nullable=False))
+    # Backfill from the link table, which remains the source of truth
+    op.execute(
+        """
+        UPDATE file
+        SET visible_function_ids = links.function_ids
+        FROM (
+            SELECT file_id, array_agg(function_id) AS function_ids
+            FROM filefunctionlink
+            GROUP BY file_id
+        ) AS links
+        WHERE file.id = links.file_id
+        """
+    )
+    op.create_index('ix_file_visible_function_ids', 'file', ['visible_function_ids'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_file_visible_function_ids', table_name='file', postgresql_using='gin')
+    op.drop_column('file', 'visible_function_ids')
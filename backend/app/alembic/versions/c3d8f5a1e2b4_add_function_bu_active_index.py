@@ -0,0 +1,30 @@
+"""Add index on function business_unit_id and is_active
+
+Revision ID: c3d8f5a1e2b4
+Revises: b7c4e1f2a9d3
+Create Date: 2026-10-14
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d8f5a1e2b4'
+down_revision = 'b7c4e1f2a9d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_function_bu_active',
+        'function',
+        ['business_unit_id', 'is_active'],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_function_bu_active', table_name='function')
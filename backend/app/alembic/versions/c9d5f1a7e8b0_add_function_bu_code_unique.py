@@ -0,0 +1,44 @@
+"""Add unique constraint on function business_unit_id and code
+
+Revision ID: c9d5f1a7e8b0
+Revises: b8c4e0f6d7a9
+Create Date: 2026-10-14
+
+Fails when a business unit already has several functions with the same
+code. Those have to be renamed first; to list them:
+
+    SELECT business_unit_id, code, array_agg(id)
+    FROM function
+    GROUP BY business_unit_id, code
+    HAVING count(*) > 1;
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9d5f1a7e8b0'
+down_revision = 'b8c4e0f6d7a9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    duplicates = op.get_bind().execute(
+        sa.text(
+            'SELECT business_unit_id, code FROM function '
+            'GROUP BY business_unit_id, code HAVING count(*) > 1'
+        )
+    ).all()
+    if duplicates:
+        listed = ', '.join(f'{code!r} in business unit {bu_id}' for bu_id, code in duplicates)
+        raise RuntimeError(
+            f'Duplicate function codes must be renamed before this migration: {listed}'
+        )
+    op.create_unique_constraint('uq_function_bu_code', 'function', ['business_unit_id', 'code'])
+
+
+def downgrade():
+    op.drop_constraint('uq_function_bu_code', 'function', type_='unique')
@@ -0,0 +1,33 @@
+"""Add status to file
+
+Revision ID: d4e9a6b2f3c5
+Revises: c3d8f5a1e2b4
+Create Date: 2026-10-14
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4e9a6b2f3c5'
+down_revision = 'c3d8f5a1e2b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'file',
+        sa.Column(
+            'status',
+            sqlmodel.sql.sqltypes.AutoString(length=20),
+            nullable=False,
+            server_default='ready',
+        ),
+    )
+
+
+def downgrade():
+    op.drop_column('file', 'status')
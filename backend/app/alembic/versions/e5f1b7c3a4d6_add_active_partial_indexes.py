@@ -0,0 +1,39 @@
+"""Add partial indexes on active business units and functions
+
+Revision ID: e5f1b7c3a4d6
+Revises: d4e9a6b2f3c5
+Create Date: 2026-10-14
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5f1b7c3a4d6'
+down_revision = 'd4e9a6b2f3c5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_bu_active',
+        'businessunit',
+        ['name'],
+        unique=False,
+        postgresql_where=sa.text('is_active'),
+    )
+    op.create_index(
+        'ix_function_active',
+        'function',
+        ['name'],
+        unique=False,
+        postgresql_where=sa.text('is_active'),
+    )
+
+
+def downgrade():
+    op.drop_index('ix_function_active', table_name='function')
+    op.drop_index('ix_bu_active', table_name='businessunit')
@@ -0,0 +1,30 @@
+"""Add index on file owner_id and created_at
+
+Revision ID: f6a2c8d4b5e7
+Revises: e5f1b7c3a4d6
+Create Date: 2026-10-14
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6a2c8d4b5e7'
+down_revision = 'e5f1b7c3a4d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_file_owner_created',
+        'file',
+        ['owner_id', 'created_at', 'id'],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_file_owner_created', table_name='file')
@@ -6,12 +6,13 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
-from sqlmodel import Session
+from sqlalchemy import ColumnElement, true
+from sqlmodel import Session, col
 
 from app.core import security
 from app.core.config import settings
 from app.core.db import engine
-from app.models import TokenPayload, User
+from app.models import BusinessUnit, Function, TokenPayload, User
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
@@ -19,7 +20,9 @@ reusable_oauth2 = OAuth2PasswordBearer(
 
 
 def get_db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+    # Keep loaded attributes after commit, so returning a freshly written
+    # object doesn't need another SELECT
+    with Session(engine, expire_on_commit=False) as session:
         yield session
 
 
@@ -55,3 +58,14 @@ def get_current_active_superuser(current_user: CurrentUser) -> User:
             status_code=403, detail="The user doesn't have enough privileges"
         )
     return current_user
+
+
+def visibility_filter(
+    model: type[BusinessUnit] | type[Function], user: User
+) -> ColumnElement[bool]:
+    """Filter expression limiting non-superusers to active rows of `model`."""
+    if user.is_superuser:
+        return true()
+    # Compare with `= true` rather than `IS TRUE`: only the former lets the
+    # planner use the partial indexes on `WHERE is_active`
+    return col(model.is_active) == true()
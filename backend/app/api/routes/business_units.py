@@ -1,10 +1,17 @@
 import uuid
+from collections.abc import Sequence
 from typing import Any
 
 from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy import Row
 from sqlmodel import func, select
 
-from app.api.deps import CurrentUser, SessionDep, get_current_active_superuser
+from app.api.deps import (
+    CurrentUser,
+    SessionDep,
+    get_current_active_superuser,
+    visibility_filter,
+)
 from app import crud
 from app.models import (
     BusinessUnit,
@@ -27,25 +34,37 @@ def read_business_units(
 ) -> Any:
     """Retrieve all business units."""
     if current_user.is_superuser:
-        count_statement = select(func.count()).select_from(BusinessUnit)
-        count = session.exec(count_statement).one()
-        statement = select(BusinessUnit).offset(skip).limit(limit)
-        bus = session.exec(statement).all()
-    else:
-        # Non-superusers can only see active BUs
-        count_statement = (
-            select(func.count())
-            .select_from(BusinessUnit)
-            .where(BusinessUnit.is_active == True)
-        )
-        count = session.exec(count_statement).one()
-        statement = (
-            select(BusinessUnit)
-            .where(BusinessUnit.is_active == True)
-            .offset(skip)
-            .limit(limit)
-        )
-        bus = session.exec(statement).all()
+        # Unfiltered listing: use the table estimate instead of counting rows
+        estimated_count = crud.get_estimated_count(session=session, model=BusinessUnit)
+        if estimated_count is not None:
+            statement = (
+                select(BusinessUnit)
+                .order_by(BusinessUnit.name)
+                .offset(skip)
+                .limit(limit)
+            )
+            bus = session.exec(statement).all()
+            return BusinessUnitsPublic(
+                data=bus, count=estimated_count, is_approximate=True
+            )
+
+    # Non-superusers can only see active BUs
+    active_filter = visibility_filter(BusinessUnit, current_user)
+    windowed_statement = select(
+        BusinessUnit, func.count().over().label("total")
+    ).where(active_filter)
+    count_statement = (
+        select(func.count()).select_from(BusinessUnit).where(active_filter)
+    )
+    windowed_statement = (
+        windowed_statement.order_by(BusinessUnit.name).offset(skip).limit(limit)
+    )
+    rows: Sequence[Row[tuple[BusinessUnit, int]]] = session.execute(
+        windowed_statement
+    ).all()
+    # The window total is only available when the page is not empty
+    count = rows[0].total if rows else session.exec(count_statement).one()
+    bus = [row[0] for row in rows]
 
     return BusinessUnitsPublic(data=bus, count=count)
 
@@ -1,48 +1,148 @@
+import base64
 import logging
+import os
+import re
+import shutil
+import tempfile
 import uuid
+from datetime import datetime, timedelta
 from typing import Any
 
-from fastapi import APIRouter, HTTPException, UploadFile, Query, Form
-from fastapi.responses import Response
-from sqlmodel import func, select
+from fastapi import APIRouter, BackgroundTasks, HTTPException, UploadFile, Query, Form
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, literal, tuple_, update
+from sqlmodel import Session, col, func, select
 
 from app.api.deps import CurrentUser, SessionDep
-from app.core.minio import minio_client
+from app.core.db import engine
+from app.core.minio import ObjectNotFoundError, minio_client
 from app.crud import (
-    check_file_access,
+    FILE_PUBLIC_COLUMNS,
+    bulk_create_files,
     delete_file,
-    get_file_by_id,
-    get_files_by_owner,
+    delete_files,
+    get_estimated_count,
+    get_file_for_user,
     get_files_count_by_owner,
 )
-from app.models import File, FileCreate, FileFunctionLink, FilePublic, FilesPublic, Message
+from app.models import (
+    File,
+    FileCreate,
+    FileFunctionLink,
+    FilePresignedUpload,
+    FilePublic,
+    FilesPublic,
+    FileStatusPublic,
+    FileUploadRequest,
+    Function,
+    Message,
+    get_datetime_utc,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/files", tags=["files"])
 
+# Object name prefix for uploads waiting to be finalized
+STAGING_PREFIX = "staging/"
+
+# Lifetime of presigned upload URLs in seconds
+PRESIGNED_UPLOAD_EXPIRES_IN = 15 * 60
+
+# Age after which a pending upload is considered abandoned: the upload URL
+# has expired and the client had as long again to call /complete
+PENDING_UPLOAD_MAX_AGE = 2 * PRESIGNED_UPLOAD_EXPIRES_IN
+
+# Comma-separated list of UUIDs, as accepted by visible_function_ids
+_UUID_PATTERN = r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+UUID_RE = re.compile(_UUID_PATTERN)
+UUID_LIST_RE = re.compile(rf"\s*{_UUID_PATTERN}\s*(?:,\s*{_UUID_PATTERN}\s*)*")
+
+
+def encode_cursor(created_at: datetime, file_id: uuid.UUID) -> str:
+    """Encode the sort key of the last file on a page as an opaque cursor."""
+    raw = f"{created_at.isoformat()}|{file_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """Decode a cursor produced by `encode_cursor`."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, file_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(file_id)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+
 
 @router.get("/", response_model=FilesPublic)
 def read_files(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    session: SessionDep,
+    current_user: CurrentUser,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = Query(
+        None, description="Cursor from a previous page; takes precedence over skip"
+    ),
 ) -> Any:
     """
     Retrieve files.
     """
+    count = None
     if current_user.is_superuser:
-        count_statement = select(func.count()).select_from(File)
-        count = session.exec(count_statement).one()
-        statement = (
-            select(File).order_by(File.created_at.desc()).offset(skip).limit(limit)
+        # Unfiltered listing: use the table estimate instead of counting rows
+        count = get_estimated_count(session=session, model=File)
+    is_approximate = count is not None
+
+    # Fetch only the columns FilePublic needs, without hydrating ORM objects
+    columns = list(FILE_PUBLIC_COLUMNS)
+    if count is None and not cursor:
+        # Get the total in the same round trip via a window function; it only
+        # covers the full result set for offset queries
+        columns.append(func.count().over().label("total"))
+    statement = select(*columns)
+    # Files still being uploaded are not listed
+    statement = statement.where(File.status == "ready")
+    if not current_user.is_superuser:
+        statement = statement.where(File.owner_id == current_user.id)
+    statement = statement.order_by(
+        col(File.created_at).desc(), col(File.id).desc()
+    ).limit(limit)
+
+    if cursor:
+        # Keyset pagination: seek past the last seen (created_at, id) pair
+        # instead of scanning and discarding `skip` rows
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        statement = statement.where(
+            tuple_(col(File.created_at), col(File.id))
+            < tuple_(literal(cursor_created_at), literal(cursor_id))
         )
-        files = session.exec(statement).all()
     else:
-        count = get_files_count_by_owner(session=session, owner_id=current_user.id)
-        files = get_files_by_owner(
-            session=session, owner_id=current_user.id, skip=skip, limit=limit
-        )
-
-    return FilesPublic(data=files, count=count)
+        statement = statement.offset(skip)
+    rows = session.exec(statement).all()
+
+    if count is None:
+        # The window total is only available when the page is not empty
+        if rows and not cursor:
+            count = rows[0].total
+        elif current_user.is_superuser:
+            count = session.exec(
+                select(func.count()).select_from(File).where(File.status == "ready")
+            ).one()
+        else:
+            count = get_files_count_by_owner(session=session, owner_id=current_user.id)
+    files = [FilePublic.model_validate(row._mapping) for row in rows]
+
+    next_cursor = None
+    if len(files) == limit and files[-1].created_at:
+        next_cursor = encode_cursor(files[-1].created_at, files[-1].id)
+
+    return FilesPublic(
+        data=files,
+        count=count,
+        is_approximate=is_approximate,
+        next_cursor=next_cursor,
+    )
 
 
 @router.get("/{id}", response_model=FilePublic)
@@ -50,57 +150,147 @@ def read_file(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) ->
     """
     Get file metadata by ID.
     """
-    file = get_file_by_id(session=session, file_id=id)
+    file = get_file_for_user(session=session, file_id=id, user=current_user)
     if not file:
         raise HTTPException(status_code=404, detail="File not found")
-    if not check_file_access(session=session, file=file, user=current_user):
-        raise HTTPException(status_code=403, detail="Not enough permissions")
     return file
 
 
-@router.post("/upload", response_model=FilePublic)
-async def upload_file(
+def parse_visible_function_ids(
+    session: Session, visible_function_ids: str | None
+) -> list[uuid.UUID] | None:
+    """Parse comma-separated function IDs and check that they all exist."""
+    if not visible_function_ids:
+        return None
+    # Validate the whole list with one match before constructing any UUID
+    if not UUID_LIST_RE.fullmatch(visible_function_ids):
+        raise HTTPException(status_code=422, detail="Invalid function IDs format")
+    parsed_function_ids = [
+        uuid.UUID(fid) for fid in UUID_RE.findall(visible_function_ids)
+    ]
+    return check_functions_exist(session, parsed_function_ids)
+
+
+def check_functions_exist(
+    session: Session, function_ids: list[uuid.UUID]
+) -> list[uuid.UUID]:
+    """Check that all functions exist in one query, before anything is stored."""
+    unique_ids = list(dict.fromkeys(function_ids))
+    existing_ids = set(
+        session.exec(
+            select(Function.id).where(col(Function.id).in_(unique_ids))
+        ).all()
+    )
+    if len(existing_ids) != len(unique_ids):
+        raise HTTPException(status_code=404, detail="Function not found")
+    return unique_ids
+
+
+def get_upload_size(file: UploadFile) -> int:
+    """Determine the size of an upload without reading it into memory."""
+    file_size = file.size
+    if file_size is None:
+        file.file.seek(0, os.SEEK_END)
+        file_size = file.file.tell()
+    file.file.seek(0)
+    return file_size
+
+
+def prepare_upload(
     *,
-    session: SessionDep,
-    current_user: CurrentUser,
+    owner_id: uuid.UUID,
     file: UploadFile,
-    responsible_function_id: uuid.UUID | None = Query(None, description="Function that uploaded this file"),
-    visible_bu_id: uuid.UUID | None = Query(None, description="BU that can view this file"),
-    visible_function_ids: str | None = Query(None, description="Comma-separated function IDs that can view this file"),
-) -> Any:
-    """
-    Upload a new file with optional organization permissions.
+    responsible_function_id: uuid.UUID | None,
+    visible_bu_id: uuid.UUID | None,
+    visible_function_ids: list[uuid.UUID] | None,
+) -> FileCreate:
+    """Validate an upload and build the metadata to store it with.
+
+    `visible_function_ids` must already be parsed and checked, see
+    `parse_visible_function_ids`.
     """
-    logger.info(f"[UPLOAD START] User: {current_user.id}, File object: {file}, Filename: {file.filename}")
+    logger.info(f"[UPLOAD START] User: {owner_id}, File object: {file}, Filename: {file.filename}")
 
     # Validate filename
     if not file or not file.filename:
         logger.error("[UPLOAD ERROR] File or filename is empty")
         raise HTTPException(status_code=422, detail="File name cannot be empty")
 
-    # Read file content
-    logger.info(f"[UPLOAD] Reading file content...")
-    try:
-        content = await file.read()
-        file_size = len(content)
-        content_type = file.content_type or "application/octet-stream"
-        logger.info(f"[UPLOAD] File read successfully: size={file_size}, type={content_type}")
-    except Exception as e:
-        logger.error(f"[UPLOAD ERROR] Failed to read file: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Failed to read file: {e}") from e
+    content_type = file.content_type or "application/octet-stream"
+    file_size = get_upload_size(file)
+    logger.info(f"[UPLOAD] File received: size={file_size}, type={content_type}")
 
-    # Generate unique filename
-    file_extension = file.filename.split(".")[-1] if "." in file.filename else ""
-    unique_filename = f"{current_user.id}/{uuid.uuid4()}.{file_extension}"
+    unique_filename = generate_object_name(owner_id, file.filename)
     logger.info(f"[UPLOAD] Generated unique filename: {unique_filename}")
 
-    # Upload to MinIO
+    return FileCreate(
+        filename=unique_filename,
+        original_filename=file.filename,
+        content_type=content_type,
+        file_size=file_size,
+        responsible_function_id=responsible_function_id,
+        visible_bu_id=visible_bu_id,
+        visible_function_ids=visible_function_ids,
+    )
+
+
+def generate_object_name(owner_id: uuid.UUID, filename: str) -> str:
+    """Generate a unique object name in the bucket for an uploaded file."""
+    file_extension = filename.split(".")[-1] if "." in filename else ""
+    return f"{owner_id}/{uuid.uuid4()}.{file_extension}"
+
+
+def staging_object_name(object_name: str) -> str:
+    """Object name presigned uploads are written to before they complete."""
+    return f"{STAGING_PREFIX}{object_name}"
+
+
+def remove_file_objects(file: File) -> None:
+    """Delete a file's objects from MinIO, including its staged upload."""
+    minio_client.delete_file(file.filename)
+    if file.status == "pending":
+        minio_client.delete_file(staging_object_name(file.filename))
+
+
+def cleanup_expired_uploads(owner_id: uuid.UUID) -> None:
+    """Remove an owner's presigned uploads that were never completed.
+
+    Only "pending" files are presigned uploads; "uploading" ones are being
+    stored by `finalize_upload` and are left alone.
+    """
+    cutoff = get_datetime_utc() - timedelta(seconds=PENDING_UPLOAD_MAX_AGE)
+    with Session(engine) as session:
+        expired_files = session.exec(
+            select(File).where(
+                File.owner_id == owner_id,
+                File.status == "pending",
+                col(File.created_at) < cutoff,
+            )
+        ).all()
+        removed_ids = []
+        for file in expired_files:
+            try:
+                remove_file_objects(file)
+            except RuntimeError as e:
+                logger.error(f"[UPLOAD ERROR] Failed to remove expired upload: {e}", exc_info=True)
+                continue
+            removed_ids.append(file.id)
+        delete_files(session=session, file_ids=removed_ids)
+        if removed_ids:
+            logger.info(f"[UPLOAD] Removed {len(removed_ids)} expired uploads")
+
+
+def store_upload(
+    *, file: UploadFile, object_name: str, content_type: str, file_size: int
+) -> None:
+    """Stream an upload to MinIO under the given object name."""
     logger.info(f"[UPLOAD] Starting MinIO upload...")
     try:
         minio_client.upload_file(
-            file_data=content,
-            filename=unique_filename,
+            file_data=file.file,
+            filename=object_name,
             content_type=content_type,
+            length=file_size,
         )
         logger.info(f"[UPLOAD] MinIO upload successful")
     except RuntimeError as e:
@@ -110,46 +300,345 @@ async def upload_file(
         logger.error(f"[UPLOAD ERROR] Unexpected error during MinIO upload: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"MinIO upload error: {e}") from e
 
-    # Parse visible_function_ids if provided
-    parsed_function_ids = None
-    if visible_function_ids:
-        try:
-            parsed_function_ids = [uuid.UUID(fid.strip()) for fid in visible_function_ids.split(",")]
-        except ValueError:
-            raise HTTPException(status_code=422, detail="Invalid function IDs format")
 
-    # Save file metadata to database
+def save_file_metadata(
+    *,
+    session: Session,
+    file_in: FileCreate,
+    owner_id: uuid.UUID,
+    status: str = "ready",
+) -> File:
+    """Save file metadata and its visible functions to the database."""
     logger.info(f"[UPLOAD] Saving metadata to database...")
     try:
-        file_in = FileCreate(
-            filename=unique_filename,
-            original_filename=file.filename or "unnamed",
-            content_type=content_type,
-            file_size=file_size,
-            responsible_function_id=responsible_function_id,
-            visible_bu_id=visible_bu_id,
-            visible_function_ids=parsed_function_ids,
+        db_file = File.model_validate(
+            file_in,
+            update={
+                "owner_id": owner_id,
+                "status": status,
+                "visible_function_ids": file_in.visible_function_ids or [],
+            },
         )
-
-        db_file = File.model_validate(file_in, update={"owner_id": current_user.id})
         session.add(db_file)
 
-        # Handle many-to-many relationships for visible_functions
-        if parsed_function_ids:
-            for func_id in parsed_function_ids:
-                link = FileFunctionLink(file_id=db_file.id, function_id=func_id)
-                session.add(link)
+        # Insert all visible_functions links with a single multi-row INSERT
+        if file_in.visible_function_ids:
+            session.flush()
+            session.execute(
+                insert(FileFunctionLink).values(
+                    [
+                        {"file_id": db_file.id, "function_id": func_id}
+                        for func_id in file_in.visible_function_ids
+                    ]
+                )
+            )
 
         session.commit()
-        session.refresh(db_file)
         logger.info(f"[UPLOAD SUCCESS] File saved to database: {db_file.id}")
     except Exception as e:
         logger.error(f"[UPLOAD ERROR] Database save failed: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Database error: {e}") from e
+    return db_file
+
+
+def spool_upload(file: UploadFile) -> str:
+    """Copy an upload to a local temporary file that outlives the request."""
+    with tempfile.NamedTemporaryFile(delete=False) as spool:
+        shutil.copyfileobj(file.file, spool)
+    return spool.name
+
+
+def finalize_upload(
+    *,
+    file_id: uuid.UUID,
+    spool_path: str,
+    object_name: str,
+    content_type: str,
+    file_size: int,
+) -> None:
+    """Upload a spooled file to MinIO and mark its uploading record ready."""
+    try:
+        with open(spool_path, "rb") as spool:
+            minio_client.upload_file(
+                file_data=spool,
+                filename=object_name,
+                content_type=content_type,
+                length=file_size,
+            )
+    except Exception as e:
+        logger.error(f"[UPLOAD ERROR] Background MinIO upload failed: {e}", exc_info=True)
+        # There is no content to retry from once the spool is gone
+        with Session(engine) as session:
+            delete_files(session=session, file_ids=[file_id])
+        return
+    finally:
+        os.unlink(spool_path)
+
+    with Session(engine) as session:
+        result = session.exec(
+            update(File)
+            .where(col(File.id) == file_id, col(File.status) == "uploading")
+            .values(status="ready")
+        )
+        session.commit()
+    if result.rowcount == 0:
+        # The file was deleted while it was being uploaded
+        logger.info(f"[UPLOAD] File deleted before upload finished: {file_id}")
+        minio_client.delete_file(object_name)
+        return
+    logger.info(f"[UPLOAD SUCCESS] Background upload finished: {file_id}")
+
+
+@router.post("/upload", response_model=FilePublic)
+def upload_file(
+    *,
+    session: SessionDep,
+    current_user: CurrentUser,
+    file: UploadFile,
+    responsible_function_id: uuid.UUID | None = Query(None, description="Function that uploaded this file"),
+    visible_bu_id: uuid.UUID | None = Query(None, description="BU that can view this file"),
+    visible_function_ids: str | None = Query(None, description="Comma-separated function IDs that can view this file"),
+) -> Any:
+    """
+    Upload a new file with optional organization permissions.
+    """
+    file_in = prepare_upload(
+        owner_id=current_user.id,
+        file=file,
+        responsible_function_id=responsible_function_id,
+        visible_bu_id=visible_bu_id,
+        visible_function_ids=parse_visible_function_ids(session, visible_function_ids),
+    )
+    store_upload(
+        file=file,
+        object_name=file_in.filename,
+        content_type=file_in.content_type,
+        file_size=file_in.file_size,
+    )
+    return save_file_metadata(
+        session=session, file_in=file_in, owner_id=current_user.id
+    )
+
+
+@router.post("/upload-async", response_model=FilePublic, status_code=202)
+def upload_file_async(
+    *,
+    session: SessionDep,
+    current_user: CurrentUser,
+    background_tasks: BackgroundTasks,
+    file: UploadFile,
+    responsible_function_id: uuid.UUID | None = Query(None, description="Function that uploaded this file"),
+    visible_bu_id: uuid.UUID | None = Query(None, description="BU that can view this file"),
+    visible_function_ids: str | None = Query(None, description="Comma-separated function IDs that can view this file"),
+) -> Any:
+    """
+    Upload a new file, storing it in MinIO in the background.
 
+    The file is returned in the "uploading" status; poll `/files/{id}/status`
+    until it becomes "ready". If storing it fails the file is removed, and
+    the status endpoint answers 404.
+    """
+    file_in = prepare_upload(
+        owner_id=current_user.id,
+        file=file,
+        responsible_function_id=responsible_function_id,
+        visible_bu_id=visible_bu_id,
+        visible_function_ids=parse_visible_function_ids(session, visible_function_ids),
+    )
+    # The upload is closed once the response is sent, so keep a local copy
+    # for the background task instead of writing to MinIO twice
+    spool_path = spool_upload(file)
+    try:
+        db_file = save_file_metadata(
+            session=session,
+            file_in=file_in,
+            owner_id=current_user.id,
+            status="uploading",
+        )
+    except HTTPException:
+        os.unlink(spool_path)
+        raise
+    background_tasks.add_task(
+        finalize_upload,
+        file_id=db_file.id,
+        spool_path=spool_path,
+        object_name=file_in.filename,
+        content_type=file_in.content_type,
+        file_size=file_in.file_size,
+    )
     return db_file
 
 
+@router.post("/upload-batch", response_model=FilesPublic)
+def upload_files(
+    *,
+    session: SessionDep,
+    current_user: CurrentUser,
+    files: list[UploadFile],
+    responsible_function_id: uuid.UUID | None = Query(None, description="Function that uploaded these files"),
+    visible_bu_id: uuid.UUID | None = Query(None, description="BU that can view these files"),
+    visible_function_ids: str | None = Query(None, description="Comma-separated function IDs that can view these files"),
+) -> Any:
+    """
+    Upload several files at once, with the same organization permissions.
+
+    The metadata of all files is saved with bulk INSERTs once every file has
+    been stored.
+    """
+    parsed_function_ids = parse_visible_function_ids(session, visible_function_ids)
+    files_in = [
+        prepare_upload(
+            owner_id=current_user.id,
+            file=file,
+            responsible_function_id=responsible_function_id,
+            visible_bu_id=visible_bu_id,
+            visible_function_ids=parsed_function_ids,
+        )
+        for file in files
+    ]
+
+    stored_names: list[str] = []
+    try:
+        for file, file_in in zip(files, files_in, strict=True):
+            store_upload(
+                file=file,
+                object_name=file_in.filename,
+                content_type=file_in.content_type,
+                file_size=file_in.file_size,
+            )
+            stored_names.append(file_in.filename)
+        file_ids = bulk_create_files(
+            session=session, files_in=files_in, owner_id=current_user.id
+        )
+    except Exception as e:
+        # Don't leave the files stored so far behind without their metadata
+        for object_name in stored_names:
+            try:
+                minio_client.delete_file(object_name)
+            except RuntimeError:
+                logger.error(f"[UPLOAD ERROR] Failed to remove {object_name}", exc_info=True)
+        if isinstance(e, HTTPException):
+            raise
+        logger.error(f"[UPLOAD ERROR] Database save failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Database error: {e}") from e
+    logger.info(f"[UPLOAD SUCCESS] {len(file_ids)} files saved to database")
+
+    rows = session.exec(
+        select(*FILE_PUBLIC_COLUMNS).where(col(File.id).in_(file_ids))
+    ).all()
+    files_by_id = {row.id: FilePublic.model_validate(row._mapping) for row in rows}
+    return FilesPublic(
+        data=[files_by_id[file_id] for file_id in file_ids], count=len(file_ids)
+    )
+
+
+@router.post("/presign-upload", response_model=FilePresignedUpload)
+def presign_upload(
+    *,
+    session: SessionDep,
+    current_user: CurrentUser,
+    background_tasks: BackgroundTasks,
+    upload_in: FileUploadRequest,
+) -> Any:
+    """
+    Create a pending file and a presigned URL to PUT its content to directly.
+
+    The content is uploaded to a staging object; call `/files/{id}/complete`
+    once the upload has finished to move it in place. Pending uploads that
+    are not completed in time are removed.
+    """
+    function_ids = None
+    if upload_in.visible_function_ids:
+        function_ids = check_functions_exist(session, upload_in.visible_function_ids)
+
+    unique_filename = generate_object_name(
+        current_user.id, upload_in.original_filename
+    )
+    try:
+        upload_url = minio_client.get_upload_url(
+            staging_object_name(unique_filename),
+            expires_in=PRESIGNED_UPLOAD_EXPIRES_IN,
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+    file_in = FileCreate(
+        filename=unique_filename,
+        original_filename=upload_in.original_filename,
+        content_type=upload_in.content_type,
+        file_size=0,
+        responsible_function_id=upload_in.responsible_function_id,
+        visible_bu_id=upload_in.visible_bu_id,
+        visible_function_ids=function_ids,
+    )
+    db_file = save_file_metadata(
+        session=session, file_in=file_in, owner_id=current_user.id, status="pending"
+    )
+    background_tasks.add_task(cleanup_expired_uploads, current_user.id)
+    return FilePresignedUpload(
+        file=FilePublic.model_validate(db_file),
+        upload_url=upload_url,
+        expires_in=PRESIGNED_UPLOAD_EXPIRES_IN,
+    )
+
+
+@router.post("/{id}/complete", response_model=FilePublic)
+def complete_upload(
+    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+) -> Any:
+    """
+    Mark a presigned upload as complete and record its final size.
+
+    The staged content is copied to the file's final object, so later PUTs
+    to the upload URL can no longer change it.
+    """
+    file = get_file_for_user(session=session, file_id=id, user=current_user)
+    if not file:
+        raise HTTPException(status_code=404, detail="File not found")
+    if not current_user.is_superuser and file.owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if file.status == "ready":
+        raise HTTPException(status_code=409, detail="File upload is already complete")
+    if file.status != "pending":
+        raise HTTPException(status_code=409, detail="File is not a presigned upload")
+
+    staging_name = staging_object_name(file.filename)
+    try:
+        minio_client.copy_file(staging_name, file.filename)
+        stat = minio_client.stat(file.filename)
+    except ObjectNotFoundError as e:
+        raise HTTPException(
+            status_code=409, detail="File content has not been uploaded yet"
+        ) from e
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+    try:
+        minio_client.delete_file(staging_name)
+    except RuntimeError as e:
+        logger.warning(f"[UPLOAD] Failed to remove staged upload: {e}")
+
+    # Take size and type from the stored object rather than the request
+    file.file_size = stat["size"]
+    file.content_type = stat["content_type"] or file.content_type
+    file.status = "ready"
+    session.add(file)
+    session.commit()
+    return file
+
+
+@router.get("/{id}/status", response_model=FileStatusPublic)
+def read_file_status(
+    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+) -> Any:
+    """
+    Get the upload status of a file.
+    """
+    file = get_file_for_user(session=session, file_id=id, user=current_user)
+    if not file:
+        raise HTTPException(status_code=404, detail="File not found")
+    return file
+
+
 @router.get("/{id}/download")
 def download_file(
     session: SessionDep, current_user: CurrentUser, id: uuid.UUID
@@ -159,46 +648,53 @@ def download_file(
     """
     logger.info(f"[DOWNLOAD START] File ID: {id}, User: {current_user.id}")
 
-    file = get_file_by_id(session=session, file_id=id)
+    file = get_file_for_user(session=session, file_id=id, user=current_user)
     if not file:
-        logger.error(f"[DOWNLOAD ERROR] File not found: {id}")
+        logger.error(f"[DOWNLOAD ERROR] File not found or not accessible: {id}")
         raise HTTPException(status_code=404, detail="File not found")
-    if not check_file_access(session=session, file=file, user=current_user):
-        logger.error(f"[DOWNLOAD ERROR] Permission denied for user {current_user.id} on file {id}")
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if file.status != "ready":
+        raise HTTPException(status_code=409, detail="File is not ready yet")
 
     logger.info(f"[DOWNLOAD] Fetching from MinIO: {file.filename}")
     try:
-        file_content = minio_client.get_file(file.filename)
-        logger.info(f"[DOWNLOAD SUCCESS] File downloaded: {file.original_filename} ({len(file_content)} bytes)")
-        return Response(
-            content=file_content,
-            media_type=file.content_type,
-            headers={
-                "Content-Disposition": f'attachment; filename="{file.original_filename}"'
-            },
-        )
+        content, content_length = minio_client.stream_file(file.filename)
     except RuntimeError as e:
         logger.error(f"[DOWNLOAD ERROR] MinIO error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e)) from e
 
+    logger.info(f"[DOWNLOAD SUCCESS] Streaming file: {file.original_filename} ({content_length} bytes)")
+    return StreamingResponse(
+        content,
+        media_type=file.content_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{file.original_filename}"',
+            # Use the stored object's size, which the body is guaranteed to match
+            "Content-Length": str(content_length),
+        },
+    )
+
 
 @router.get("/{id}/url")
 def get_file_url(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID, expires_in: int = 3600
+    session: SessionDep,
+    current_user: CurrentUser,
+    id: uuid.UUID,
+    # Presigned URLs can be valid for at most 7 days
+    expires_in: int = Query(3600, ge=1, le=7 * 24 * 3600),
 ) -> Any:
     """
     Get a presigned URL for file download.
     """
-    file = get_file_by_id(session=session, file_id=id)
+    file = get_file_for_user(session=session, file_id=id, user=current_user)
     if not file:
         raise HTTPException(status_code=404, detail="File not found")
-    if not check_file_access(session=session, file=file, user=current_user):
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if file.status != "ready":
+        raise HTTPException(status_code=409, detail="File is not ready yet")
 
     try:
-        url = minio_client.get_file_url(file.filename, expires_in=expires_in)
-        return {"url": url, "expires_in": expires_in}
+        url, remaining = minio_client.get_file_url(file.filename, expires_in=expires_in)
+        # The URL may come from the cache, so report how long it really has left
+        return {"url": url, "expires_in": remaining}
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
@@ -210,15 +706,13 @@ def delete_file_endpoint(
     """
     Delete a file.
     """
-    file = get_file_by_id(session=session, file_id=id)
+    file = get_file_for_user(session=session, file_id=id, user=current_user)
     if not file:
         raise HTTPException(status_code=404, detail="File not found")
-    if not check_file_access(session=session, file=file, user=current_user):
-        raise HTTPException(status_code=403, detail="Not enough permissions")
 
     # Delete from MinIO
     try:
-        minio_client.delete_file(file.filename)
+        remove_file_objects(file)
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
@@ -1,10 +1,17 @@
 import uuid
+from collections.abc import Sequence
 from typing import Any
 
 from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy import Row
 from sqlmodel import func, select
 
-from app.api.deps import CurrentUser, SessionDep, get_current_active_superuser
+from app.api.deps import (
+    CurrentUser,
+    SessionDep,
+    get_current_active_superuser,
+    visibility_filter,
+)
 from app import crud
 from app.models import (
     Function,
@@ -27,23 +34,40 @@ def read_functions(
     business_unit_id: uuid.UUID | None = Query(None, description="Filter by business unit"),
 ) -> Any:
     """Retrieve all functions, optionally filtered by business unit."""
+    if current_user.is_superuser and not business_unit_id:
+        # Unfiltered listing: use the table estimate instead of counting rows
+        estimated_count = crud.get_estimated_count(session=session, model=Function)
+        if estimated_count is not None:
+            statement = (
+                select(Function).order_by(Function.name).offset(skip).limit(limit)
+            )
+            funcs = session.exec(statement).all()
+            return FunctionsPublic(
+                data=funcs, count=estimated_count, is_approximate=True
+            )
+
+    # Non-superusers can only see active functions
+    active_filter = visibility_filter(Function, current_user)
+    windowed_statement = select(
+        Function, func.count().over().label("total")
+    ).where(active_filter)
+    count_statement = select(func.count()).select_from(Function).where(active_filter)
     if business_unit_id:
-        funcs = crud.get_functions_by_bu(
-            session=session, bu_id=business_unit_id, skip=skip, limit=limit
+        windowed_statement = windowed_statement.where(
+            Function.business_unit_id == business_unit_id
         )
-        count = len(funcs)
-    else:
-        if current_user.is_superuser:
-            count_statement = select(func.count()).select_from(Function)
-            count = session.exec(count_statement).one()
-        else:
-            count_statement = (
-                select(func.count())
-                .select_from(Function)
-                .where(Function.is_active == True)
-            )
-            count = session.exec(count_statement).one()
-        funcs = crud.get_functions(session=session, skip=skip, limit=limit)
+        count_statement = count_statement.where(
+            Function.business_unit_id == business_unit_id
+        )
+    windowed_statement = (
+        windowed_statement.order_by(Function.name).offset(skip).limit(limit)
+    )
+    rows: Sequence[Row[tuple[Function, int]]] = session.execute(
+        windowed_statement
+    ).all()
+    # The window total is only available when the page is not empty
+    count = rows[0].total if rows else session.exec(count_statement).one()
+    funcs = [row[0] for row in rows]
 
     return FunctionsPublic(data=funcs, count=count)
 
@@ -77,6 +101,15 @@ def create_function(
     if not bu:
         raise HTTPException(status_code=404, detail="Business unit not found")
 
+    existing_func = crud.get_function_by_code(
+        session=session, bu_id=func_in.business_unit_id, code=func_in.code
+    )
+    if existing_func:
+        raise HTTPException(
+            status_code=400,
+            detail="A function with this code already exists in the business unit",
+        )
+
     func = crud.create_function(session=session, func_in=func_in)
     return func
 
@@ -102,6 +135,18 @@ def update_function(
         if not bu:
             raise HTTPException(status_code=404, detail="Business unit not found")
 
+    if func_in.code or func_in.business_unit_id:
+        existing_func = crud.get_function_by_code(
+            session=session,
+            bu_id=func_in.business_unit_id or db_func.business_unit_id,
+            code=func_in.code or db_func.code,
+        )
+        if existing_func and existing_func.id != func_id:
+            raise HTTPException(
+                status_code=400,
+                detail="A function with this code already exists in the business unit",
+            )
+
     func = crud.update_function(session=session, db_func=db_func, func_in=func_in)
     return func
 
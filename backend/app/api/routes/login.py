@@ -28,7 +28,10 @@ def login_access_token(
     OAuth2 compatible token login, get an access token for future requests
     """
     user = crud.authenticate(
-        session=session, email=form_data.username, password=form_data.password
+        session=session,
+        email=form_data.username,
+        password=form_data.password,
+        release_connection=True,
     )
     if not user:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
@@ -88,11 +91,15 @@ def reset_password(session: SessionDep, body: NewPassword) -> Message:
         raise HTTPException(status_code=400, detail="Invalid token")
     elif not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
+    # Hash with the connection back in the pool, once the checks are done
+    crud.release_db_connection(session=session)
+    hashed_password = security.get_password_hash(body.new_password)
     user_in_update = UserUpdate(password=body.new_password)
     crud.update_user(
         session=session,
         db_user=user,
         user_in=user_in_update,
+        hashed_password=hashed_password,
     )
     return Message(message="Password updated successfully")
 
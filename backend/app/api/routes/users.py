@@ -80,7 +80,12 @@ def create_user(*, session: SessionDep, user_in: UserCreate) -> Any:
                 detail="Function not found",
             )
 
-    user = crud.create_user(session=session, user_create=user_in)
+    # Hash with the connection back in the pool, once the checks are done
+    crud.release_db_connection(session=session)
+    hashed_password = get_password_hash(user_in.password)
+    user = crud.create_user(
+        session=session, user_create=user_in, hashed_password=hashed_password
+    )
     if settings.emails_enabled and user_in.email:
         email_data = generate_new_account_email(
             email_to=user_in.email, username=user_in.email, password=user_in.password
@@ -122,6 +127,9 @@ def update_password_me(
     """
     Update own password.
     """
+    # current_user is already loaded; verify and hash without holding the
+    # connection
+    crud.release_db_connection(session=session)
     verified, _ = verify_password(body.current_password, current_user.hashed_password)
     if not verified:
         raise HTTPException(status_code=400, detail="Incorrect password")
@@ -169,8 +177,14 @@ def register_user(session: SessionDep, user_in: UserRegister) -> Any:
             status_code=400,
             detail="The user with this email already exists in the system",
         )
+    # Hash with the connection back in the pool, so no transaction stays
+    # open while Argon2 runs
+    crud.release_db_connection(session=session)
+    hashed_password = get_password_hash(user_in.password)
     user_create = UserCreate.model_validate(user_in)
-    user = crud.create_user(session=session, user_create=user_create)
+    user = crud.create_user(
+        session=session, user_create=user_create, hashed_password=hashed_password
+    )
     return user
 
 
@@ -240,7 +254,17 @@ def update_user(
                 detail="Function not found",
             )
 
-    db_user = crud.update_user(session=session, db_user=db_user, user_in=user_in)
+    hashed_password = None
+    if user_in.password:
+        # Hash with the connection back in the pool, once the checks are done
+        crud.release_db_connection(session=session)
+        hashed_password = get_password_hash(user_in.password)
+    db_user = crud.update_user(
+        session=session,
+        db_user=db_user,
+        user_in=user_in,
+        hashed_password=hashed_password,
+    )
     return db_user
 
 
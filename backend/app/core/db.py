@@ -4,7 +4,18 @@ from app import crud
 from app.core.config import settings
 from app.models import User, UserCreate
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+engine = create_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    pool_size=settings.POSTGRES_POOL_SIZE,
+    max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+    # Recycle connections before server or proxy idle timeouts drop them, and
+    # test them on checkout so a dropped one doesn't fail the request
+    pool_recycle=settings.POSTGRES_POOL_RECYCLE,
+    pool_pre_ping=True,
+    # Reuse the most recently returned connections, so surplus ones stay idle
+    # and get closed by pool_recycle when traffic drops
+    pool_use_lifo=True,
+)
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
@@ -1,57 +1,107 @@
 """MinIO client and utility functions for file storage."""
 
-import io
-from typing import BinaryIO
+import time
+from collections.abc import Iterator
+from datetime import timedelta
+from functools import lru_cache
+from typing import Any, BinaryIO, ClassVar
 
 from minio import Minio
+from minio.commonconfig import CopySource
 from minio.error import S3Error
 
 from app.core.config import settings
 
+# Part size used for multipart uploads (MinIO requires at least 5 MiB)
+UPLOAD_PART_SIZE = 10 * 1024 * 1024
+
+# Size of the chunks downloads are streamed in
+DOWNLOAD_CHUNK_SIZE = 32 * 1024
+
+# Maximum number of presigned download URLs kept in memory
+PRESIGNED_URL_CACHE_SIZE = 4096
+
+
+class ObjectNotFoundError(RuntimeError):
+    """Raised when the requested object does not exist in the bucket."""
+
 
 class MinIOClient:
     """MinIO client wrapper for file operations."""
 
+    # Buckets already checked or created by this process
+    _verified_buckets: ClassVar[set[str]] = set()
+
     def __init__(self) -> None:
         """Initialize MinIO client (lazy initialization)."""
         self._client: Minio | None = None
+        self._signing_client: Minio | None = None
         self.bucket_name = settings.MINIO_BUCKET_NAME
+        self._presigned_get_url = lru_cache(maxsize=PRESIGNED_URL_CACHE_SIZE)(
+            self._sign_get_url
+        )
 
     @property
     def client(self) -> Minio:
         """Get or create MinIO client."""
         if self._client is None:
-            self._client = Minio(
+            client = Minio(
                 endpoint=settings.MINIO_ENDPOINT,
                 access_key=settings.MINIO_ROOT_USER,
                 secret_key=settings.MINIO_ROOT_PASSWORD,
                 secure=settings.MINIO_SECURE,
                 region=settings.MINIO_REGION,
             )
-            self._ensure_bucket_exists()
+            # Only keep the client once the bucket is known to exist, so a
+            # failed check is retried on the next access
+            self._ensure_bucket_exists(client)
+            self._client = client
         return self._client
 
-    def _ensure_bucket_exists(self) -> None:
+    @property
+    def signing_client(self) -> Minio:
+        """Get or create the client used to sign URLs handed out to browsers."""
+        if self._signing_client is None:
+            # Signing happens locally (the region is known), so this client
+            # never needs to reach the external endpoint itself
+            self._signing_client = Minio(
+                endpoint=settings.MINIO_EXTERNAL_ENDPOINT,
+                access_key=settings.MINIO_ROOT_USER,
+                secret_key=settings.MINIO_ROOT_PASSWORD,
+                secure=settings.MINIO_SECURE,
+                region=settings.MINIO_REGION,
+            )
+        return self._signing_client
+
+    def _ensure_bucket_exists(self, client: Minio) -> None:
         """Create bucket if it doesn't exist."""
+        if self.bucket_name in MinIOClient._verified_buckets:
+            return
         try:
-            if not self._client.bucket_exists(self.bucket_name):
-                self._client.make_bucket(self.bucket_name, location=settings.MINIO_REGION)
+            if not client.bucket_exists(self.bucket_name):
+                client.make_bucket(self.bucket_name, location=settings.MINIO_REGION)
         except S3Error as e:
             raise RuntimeError(f"Failed to create MinIO bucket: {e}") from e
+        MinIOClient._verified_buckets.add(self.bucket_name)
 
     def upload_file(
         self,
-        file_data: bytes | BinaryIO,
+        file_data: BinaryIO,
         filename: str,
         content_type: str,
+        length: int = -1,
     ) -> str:
         """
         Upload a file to MinIO.
 
+        The data is streamed from the file-like object, so memory usage is
+        bounded by the multipart part size rather than the file size.
+
         Args:
-            file_data: File data as bytes or file-like object
+            file_data: File-like object to read the content from
             filename: Name to give the file in storage
             content_type: MIME type of the file
+            length: Size of the data in bytes, or -1 if unknown
 
         Returns:
             The object name in the bucket
@@ -60,20 +110,41 @@ class MinIOClient:
             RuntimeError: If upload fails
         """
         try:
-            if isinstance(file_data, bytes):
-                file_data = io.BytesIO(file_data)
-
             self.client.put_object(
                 bucket_name=self.bucket_name,
                 object_name=filename,
                 data=file_data,
-                length=file_data.getbuffer().nbytes if hasattr(file_data, "getbuffer") else -1,
+                length=length,
                 content_type=content_type,
+                part_size=UPLOAD_PART_SIZE,
             )
             return filename
         except S3Error as e:
             raise RuntimeError(f"Failed to upload file: {e}") from e
 
+    def copy_file(self, source: str, destination: str) -> None:
+        """
+        Copy a file to another name within the bucket.
+
+        Args:
+            source: Name of the file to copy
+            destination: Name to give the copy
+
+        Raises:
+            ObjectNotFoundError: If the source file does not exist
+            RuntimeError: If the copy fails
+        """
+        try:
+            self.client.copy_object(
+                bucket_name=self.bucket_name,
+                object_name=destination,
+                source=CopySource(self.bucket_name, source),
+            )
+        except S3Error as e:
+            if e.code == "NoSuchKey":
+                raise ObjectNotFoundError(f"File not found: {source}") from e
+            raise RuntimeError(f"Failed to copy file: {e}") from e
+
     def delete_file(self, filename: str) -> None:
         """
         Delete a file from MinIO.
@@ -89,38 +160,118 @@ class MinIOClient:
         except S3Error as e:
             raise RuntimeError(f"Failed to delete file: {e}") from e
 
-    def get_file_url(self, filename: str, expires_in: int = 3600) -> str:
+    def get_file_url(self, filename: str, expires_in: int = 3600) -> tuple[str, int]:
         """
         Generate a presigned URL for file download.
 
+        URLs are cached and reused for up to half of their lifetime, so
+        repeated requests for the same file skip the signing work. A reused
+        URL expires earlier than `expires_in` from now, so the time it
+        actually has left is returned with it.
+
         Args:
             filename: Name of the file
             expires_in: URL expiration time in seconds (default: 1 hour)
 
         Returns:
-            Presigned URL for downloading the file
+            Presigned URL for downloading the file, and the number of seconds
+            until it expires
 
         Raises:
             RuntimeError: If URL generation fails
         """
+        now = int(time.time())
+        time_bucket = now // max(expires_in // 2, 1)
+        url, signed_at = self._presigned_get_url(filename, expires_in, time_bucket)
+        return url, signed_at + expires_in - now
+
+    def _sign_get_url(
+        self, filename: str, expires_in: int, _time_bucket: int
+    ) -> tuple[str, int]:
+        """Sign a download URL and return it with the time it was signed at.
+
+        `_time_bucket` only partitions the cache.
+        """
+        signed_at = int(time.time())
         try:
-            return self.client.presigned_get_object(
+            url = self.signing_client.presigned_get_object(
                 bucket_name=self.bucket_name,
                 object_name=filename,
-                expires=expires_in,
+                expires=timedelta(seconds=expires_in),
             )
+            return url, signed_at
         except S3Error as e:
             raise RuntimeError(f"Failed to generate file URL: {e}") from e
 
-    def get_file(self, filename: str) -> bytes:
+    def get_upload_url(self, filename: str, expires_in: int = 900) -> str:
+        """
+        Generate a presigned URL to upload a file directly to MinIO.
+
+        Args:
+            filename: Name to give the file in storage
+            expires_in: URL expiration time in seconds (default: 15 minutes)
+
+        Returns:
+            Presigned URL to PUT the file content to
+
+        Raises:
+            RuntimeError: If URL generation fails
+        """
+        try:
+            return self.signing_client.presigned_put_object(
+                bucket_name=self.bucket_name,
+                object_name=filename,
+                expires=timedelta(seconds=expires_in),
+            )
+        except S3Error as e:
+            raise RuntimeError(f"Failed to generate upload URL: {e}") from e
+
+    def stat(self, filename: str) -> dict[str, Any]:
+        """
+        Get a file's metadata from MinIO without downloading it.
+
+        Args:
+            filename: Name of the file
+
+        Returns:
+            Dictionary with the size, etag and content type of the file
+
+        Raises:
+            ObjectNotFoundError: If the file does not exist
+            RuntimeError: If the request fails
+        """
+        try:
+            obj = self.client.stat_object(
+                bucket_name=self.bucket_name,
+                object_name=filename,
+            )
+            return {
+                "size": obj.size,
+                "etag": obj.etag,
+                "content_type": obj.content_type,
+            }
+        except S3Error as e:
+            if e.code == "NoSuchKey":
+                raise ObjectNotFoundError(f"File not found: {filename}") from e
+            raise RuntimeError(f"Failed to get file metadata: {e}") from e
+
+    def stream_file(
+        self, filename: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE
+    ) -> tuple[Iterator[bytes], int]:
         """
-        Download a file from MinIO.
+        Stream a file from MinIO in chunks.
+
+        The object is opened eagerly, so a missing file raises here rather than
+        once iteration has started. The connection is released when the
+        iterator is exhausted or closed.
 
         Args:
             filename: Name of the file to download
+            chunk_size: Size of the chunks to yield in bytes
 
         Returns:
-            File content as bytes
+            Iterator over the file content, and the size of the object in
+            bytes as reported by MinIO
 
         Raises:
             RuntimeError: If download fails
@@ -130,10 +281,18 @@ class MinIOClient:
                 bucket_name=self.bucket_name,
                 object_name=filename,
             )
-            return response.read()
         except S3Error as e:
             raise RuntimeError(f"Failed to download file: {e}") from e
 
+        def iter_chunks() -> Iterator[bytes]:
+            try:
+                yield from response.stream(chunk_size)
+            finally:
+                response.close()
+                response.release_conn()
+
+        return iter_chunks(), int(response.headers["Content-Length"])
+
     def list_files(self, prefix: str = "") -> list[dict]:
         """
         List all files in the bucket.
@@ -1,7 +1,29 @@
+import itertools
+import statistics
+import time
 import uuid
-from typing import Any
-
-from sqlmodel import Session, select
+from collections import deque
+from datetime import datetime
+from typing import Any, TypeVar
+
+from sqlalchemy import (
+    ColumnElement,
+    Uuid,
+    and_,
+    bindparam,
+    delete,
+    insert,
+    lambda_stmt,
+    literal,
+    or_,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel import Session, SQLModel, col, func, select
+from sqlmodel.sql.expression import SelectOfScalar
 
 from app.core.security import get_password_hash, verify_password
 from app.models import (
@@ -11,6 +33,7 @@ from app.models import (
     File,
     FileCreate,
     FileFunctionLink,
+    FilePublic,
     Function,
     FunctionCreate,
     FunctionUpdate,
@@ -21,34 +44,110 @@ from app.models import (
     UserUpdate,
 )
 
+# Tables with fewer estimated rows than this are counted exactly
+ESTIMATED_COUNT_MIN_ROWS = 100_000
+
+
+def get_estimated_count(*, session: Session, model: type[SQLModel]) -> int | None:
+    """
+    Get the planner's row estimate for a model's table from pg_class.
+
+    Returns None when the table is small or has not been analyzed yet, in
+    which case an exact count is cheap and should be used instead.
+    """
+    estimate = session.execute(
+        text(
+            "SELECT reltuples::bigint FROM pg_class "
+            "WHERE oid = to_regclass(:table_name)"
+        ),
+        {"table_name": str(model.__tablename__)},
+    ).scalar()
+    if estimate is None or estimate < ESTIMATED_COUNT_MIN_ROWS:
+        return None
+    return int(estimate)
+
+
+# Sort key (created_at, id) of the last row of a page, used to seek to the next
+KeysetCursor = tuple[datetime, uuid.UUID]
+
+ModelT = TypeVar("ModelT", BusinessUnit, Function, File)
+
+
+def _paginate_keyset(
+    *,
+    session: Session,
+    statement: SelectOfScalar[ModelT],
+    model: type[ModelT],
+    cursor: KeysetCursor | None,
+    limit: int,
+) -> tuple[list[ModelT], KeysetCursor | None]:
+    """
+    Fetch a page ordered by (created_at, id) descending, starting after cursor.
 
-def create_user(*, session: Session, user_create: UserCreate) -> User:
+    Seeks on the sort key instead of scanning and discarding rows with OFFSET,
+    so every page costs the same. Returns the rows and the cursor of the next
+    page, or None if this was the last one.
+    """
+    created_at, id_ = col(model.created_at), col(model.id)
+    statement = statement.order_by(created_at.desc(), id_.desc()).limit(limit)
+    if cursor:
+        cursor_created_at, cursor_id = cursor
+        statement = statement.where(
+            tuple_(created_at, id_)
+            < tuple_(literal(cursor_created_at), literal(cursor_id))
+        )
+    rows = list(session.exec(statement).all())
+    next_cursor = None
+    if len(rows) == limit and rows[-1].created_at:
+        next_cursor = (rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+
+def create_user(
+    *, session: Session, user_create: UserCreate, hashed_password: str | None = None
+) -> User:
+    # Callers may hash the password up front, before their first query, so no
+    # pooled connection idles in a transaction during the slow hashing
+    if hashed_password is None:
+        hashed_password = get_password_hash(user_create.password)
     db_obj = User.model_validate(
-        user_create, update={"hashed_password": get_password_hash(user_create.password)}
+        user_create, update={"hashed_password": hashed_password}
     )
     session.add(db_obj)
     session.commit()
-    session.refresh(db_obj)
     return db_obj
 
 
-def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
+def update_user(
+    *,
+    session: Session,
+    db_user: User,
+    user_in: UserUpdate,
+    hashed_password: str | None = None,
+) -> Any:
     user_data = user_in.model_dump(exclude_unset=True)
     extra_data = {}
     if "password" in user_data:
-        password = user_data["password"]
-        hashed_password = get_password_hash(password)
+        # As in create_user, callers may pass the hash of the new password
+        if hashed_password is None:
+            hashed_password = get_password_hash(user_data["password"])
         extra_data["hashed_password"] = hashed_password
     db_user.sqlmodel_update(user_data, update=extra_data)
     session.add(db_user)
     session.commit()
-    session.refresh(db_user)
     return db_user
 
 
+# Read statements for the hot lookups are built once as lambda statements, so
+# per call SQLAlchemy only binds parameters instead of constructing the select
+# and computing its cache key again
+_USER_BY_EMAIL = lambda_stmt(
+    lambda: select(User).where(User.email == bindparam("email"))
+)
+
+
 def get_user_by_email(*, session: Session, email: str) -> User | None:
-    statement = select(User).where(User.email == email)
-    session_user = session.exec(statement).first()
+    session_user = session.execute(_USER_BY_EMAIL, {"email": email}).scalars().first()
     return session_user
 
 
@@ -57,21 +156,89 @@ def get_user_by_email(*, session: Session, email: str) -> User | None:
 DUMMY_HASH = "$argon2id$v=19$m=65536,t=3,p=4$MjQyZWE1MzBjYjJlZTI0Yw$YTU4NGM5ZTZmYjE2NzZlZjY0ZWY3ZGRkY2U2OWFjNjk"
 
 
-def authenticate(*, session: Session, email: str, password: str) -> User | None:
+# The miss path sleeps for the median of the latest verification durations
+VERIFY_DURATION_SAMPLES = 100
+# Misses still verify against DUMMY_HASH until this many durations were seen,
+# and then once every VERIFY_DUMMY_EVERY, so the median follows the current
+# load even when there are no successful logins
+MIN_VERIFY_DURATION_SAMPLES = 5
+VERIFY_DUMMY_EVERY = 10
+
+_verify_durations: deque[float] = deque(maxlen=VERIFY_DURATION_SAMPLES)
+_miss_counter = itertools.count(1)
+
+
+def _timed_verify_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Verify a password, recording how long it took."""
+    start = time.perf_counter()
+    result = verify_password(plain_password, hashed_password)
+    _verify_durations.append(time.perf_counter() - start)
+    return result
+
+
+def _wait_like_verify_password(plain_password: str) -> None:
+    """Take as long as a password verification currently takes."""
+    durations = _verify_durations.copy()
+    if (
+        len(durations) < MIN_VERIFY_DURATION_SAMPLES
+        or next(_miss_counter) % VERIFY_DUMMY_EVERY == 0
+    ):
+        _timed_verify_password(plain_password, DUMMY_HASH)
+    else:
+        time.sleep(statistics.median(durations))
+
+
+def release_db_connection(*, session: Session) -> None:
+    """
+    End the session's transaction so its pooled connection is given back.
+
+    Called before deliberately slow password hashing or verification, so no
+    connection idles in a transaction meanwhile; the next query begins a new
+    one. Only call it when the session has nothing left to commit.
+    """
+    session.commit()
+
+
+def authenticate(
+    *, session: Session, email: str, password: str, release_connection: bool = False
+) -> User | None:
+    """
+    Get the user with the given credentials, or None.
+
+    With release_connection, the lookup's transaction is committed before the
+    deliberately slow password check, so its pooled connection serves other
+    requests meanwhile. Only pass it when the session has nothing else to
+    commit, e.g. from the login endpoint.
+    """
     db_user = get_user_by_email(session=session, email=email)
-    if not db_user:
-        # Prevent timing attacks by running password verification even when user doesn't exist
-        # This ensures the response time is similar whether or not the email exists
-        verify_password(password, DUMMY_HASH)
+    hashed_password = db_user.hashed_password if db_user else None
+    if release_connection:
+        release_db_connection(session=session)
+    if not db_user or hashed_password is None:
+        # Prevent timing attacks by taking as long as a password verification
+        # even when the user doesn't exist. Mostly sleeping instead of
+        # verifying against DUMMY_HASH keeps probes for unknown emails from
+        # costing a full Argon2 computation each
+        _wait_like_verify_password(password)
         return None
-    verified, updated_password_hash = verify_password(password, db_user.hashed_password)
+    verified, updated_password_hash = _timed_verify_password(
+        password, hashed_password
+    )
     if not verified:
         return None
     if updated_password_hash:
-        db_user.hashed_password = updated_password_hash
-        session.add(db_user)
+        # Write just the new hash; the caller already has the rest of the row
+        session.execute(
+            update(User)
+            .where(col(User.id) == db_user.id)
+            .values(hashed_password=updated_password_hash),
+            execution_options={"synchronize_session": False},
+        )
         session.commit()
-        session.refresh(db_user)
+        # Reflect it on the object without marking it dirty for another UPDATE
+        set_committed_value(db_user, "hashed_password", updated_password_hash)
     return db_user
 
 
@@ -79,39 +246,174 @@ def create_item(*, session: Session, item_in: ItemCreate, owner_id: uuid.UUID) -
     db_item = Item.model_validate(item_in, update={"owner_id": owner_id})
     session.add(db_item)
     session.commit()
-    session.refresh(db_item)
     return db_item
 
 
 def create_file(*, session: Session, file_in: FileCreate, owner_id: uuid.UUID) -> File:
-    db_file = File.model_validate(file_in, update={"owner_id": owner_id})
+    function_ids = file_in.visible_function_ids or []
+    db_file = File.model_validate(
+        file_in, update={"owner_id": owner_id, "visible_function_ids": function_ids}
+    )
     session.add(db_file)
+    if function_ids:
+        session.flush()
+        session.execute(
+            insert(FileFunctionLink).values(
+                [
+                    {"file_id": db_file.id, "function_id": func_id}
+                    for func_id in function_ids
+                ]
+            )
+        )
     session.commit()
-    session.refresh(db_file)
     return db_file
 
 
+# Rows per INSERT statement, keeping the bound parameter count well below
+# PostgreSQL's limit
+BULK_INSERT_BATCH_SIZE = 1000
+
+
+def bulk_create_files(
+    *, session: Session, files_in: list[FileCreate], owner_id: uuid.UUID
+) -> list[uuid.UUID]:
+    """
+    Create many files, with their visible functions, in a single transaction.
+
+    Rows are written with multi-row INSERTs of up to BULK_INSERT_BATCH_SIZE
+    rows each instead of one round trip per file. Returns the new file IDs,
+    in the order of files_in.
+    """
+    file_rows: list[dict[str, Any]] = []
+    link_rows: list[dict[str, uuid.UUID]] = []
+    for file_in in files_in:
+        function_ids = file_in.visible_function_ids or []
+        db_file = File.model_validate(
+            file_in,
+            update={"owner_id": owner_id, "visible_function_ids": function_ids},
+        )
+        file_rows.append(db_file.model_dump())
+        link_rows.extend(
+            {"file_id": db_file.id, "function_id": func_id}
+            for func_id in function_ids
+        )
+    # Files first, so the links' foreign keys resolve
+    for rows, table in ((file_rows, File), (link_rows, FileFunctionLink)):
+        for start in range(0, len(rows), BULK_INSERT_BATCH_SIZE):
+            batch = rows[start : start + BULK_INSERT_BATCH_SIZE]
+            session.execute(insert(table).values(batch))
+    session.commit()
+    return [row["id"] for row in file_rows]
+
+
 def get_file_by_id(*, session: Session, file_id: uuid.UUID) -> File | None:
+    return session.get(File, file_id)
+
+
+def file_access_condition(user: User) -> ColumnElement[bool]:
+    """
+    SQL condition matching the files a non-superuser may access.
+
+    Mirrors the rules of check_file_access for use inside queries.
+    """
+    visible_function_ids = col(File.visible_function_ids)
+    conditions: list[ColumnElement[bool]] = [
+        col(File.owner_id) == user.id,
+        # No restrictions set
+        and_(
+            col(File.visible_bu_id).is_(None),
+            func.cardinality(visible_function_ids) == 0,
+        ),
+    ]
+    if user.business_unit_id:
+        conditions.append(col(File.visible_bu_id) == user.business_unit_id)
+    if user.function_id:
+        # Containment, unlike = ANY(), can use the GIN index on the array
+        conditions.append(visible_function_ids.contains([user.function_id]))
+    return or_(*conditions)
+
+
+def get_file_for_user(
+    *, session: Session, file_id: uuid.UUID, user: User
+) -> File | None:
+    """
+    Get a file by ID only if the user may access it.
+
+    Applies the same rules as check_file_access, but inside the SELECT, so
+    fetching and authorizing a file takes a single query.
+    """
     statement = select(File).where(File.id == file_id)
-    session_file = session.exec(statement).first()
-    return session_file
+    if not user.is_superuser:
+        statement = statement.where(file_access_condition(user))
+    return session.exec(statement).first()
+
+
+_FILES_BY_OWNER = lambda_stmt(
+    lambda: select(File)
+    .where(File.owner_id == bindparam("owner_id"))
+    .offset(bindparam("skip"))
+    .limit(bindparam("limit"))
+)
 
 
 def get_files_by_owner(
     *, session: Session, owner_id: uuid.UUID, skip: int = 0, limit: int = 100
 ) -> list[File]:
-    statement = select(File).where(File.owner_id == owner_id).offset(skip).limit(limit)
-    return list(session.exec(statement).all())
+    params = {"owner_id": owner_id, "skip": skip, "limit": limit}
+    return list(session.execute(_FILES_BY_OWNER, params).scalars().all())
 
 
-def get_files_count_by_owner(*, session: Session, owner_id: uuid.UUID) -> int:
+# Columns matching the fields of FilePublic, for read-only listings
+FILE_PUBLIC_COLUMNS = tuple(getattr(File, name) for name in FilePublic.model_fields)
+
+
+def get_files_by_owner_keyset(
+    *,
+    session: Session,
+    owner_id: uuid.UUID,
+    cursor: KeysetCursor | None = None,
+    limit: int = 100,
+) -> tuple[list[File], KeysetCursor | None]:
     statement = select(File).where(File.owner_id == owner_id)
-    return len(session.exec(statement).all())
+    return _paginate_keyset(
+        session=session, statement=statement, model=File, cursor=cursor, limit=limit
+    )
 
 
-def delete_file(*, session: Session, db_file: File) -> File:
-    session.delete(db_file)
+_FILES_COUNT_BY_OWNER = lambda_stmt(
+    lambda: select(func.count())
+    .select_from(File)
+    .where(File.owner_id == bindparam("owner_id"), File.status == "ready")
+)
+
+
+def get_files_count_by_owner(*, session: Session, owner_id: uuid.UUID) -> int:
+    """Count a user's listed files, leaving out those still being uploaded."""
+    params = {"owner_id": owner_id}
+    return int(session.execute(_FILES_COUNT_BY_OWNER, params).scalar_one())
+
+
+def delete_files(*, session: Session, file_ids: list[uuid.UUID]) -> None:
+    """
+    Delete files by ID with a single DELETE.
+
+    Their visible function links are removed by the database's ON DELETE
+    CASCADE instead of being loaded and deleted row by row.
+    """
+    if not file_ids:
+        return
+    session.execute(
+        delete(File).where(col(File.id).in_(file_ids)),
+        execution_options={"synchronize_session": False},
+    )
     session.commit()
+
+
+def delete_file(*, session: Session, db_file: File) -> File:
+    # Load (if expired) and detach first, so the returned object stays usable
+    obj_id = db_file.id
+    session.expunge(db_file)
+    delete_files(session=session, file_ids=[obj_id])
     return db_file
 
 
@@ -124,7 +426,6 @@ def create_business_unit(*, session: Session, bu_in: BusinessUnitCreate) -> Busi
     db_obj = BusinessUnit.model_validate(bu_in)
     session.add(db_obj)
     session.commit()
-    session.refresh(db_obj)
     return db_obj
 
 
@@ -132,11 +433,17 @@ def get_business_unit_by_id(*, session: Session, bu_id: uuid.UUID) -> BusinessUn
     return session.get(BusinessUnit, bu_id)
 
 
+_BUSINESS_UNITS = lambda_stmt(
+    lambda: select(BusinessUnit).offset(bindparam("skip")).limit(bindparam("limit"))
+)
+
+
 def get_business_units(
     *, session: Session, skip: int = 0, limit: int = 100
 ) -> list[BusinessUnit]:
-    statement = select(BusinessUnit).offset(skip).limit(limit)
-    return list(session.exec(statement).all())
+    params = {"skip": skip, "limit": limit}
+    return list(session.execute(_BUSINESS_UNITS, params).scalars().all())
+
 
 
 def update_business_unit(
@@ -146,13 +453,43 @@ def update_business_unit(
     db_bu.sqlmodel_update(bu_data)
     session.add(db_bu)
     session.commit()
-    session.refresh(db_bu)
     return db_bu
 
 
-def delete_business_unit(*, session: Session, db_bu: BusinessUnit) -> BusinessUnit:
-    session.delete(db_bu)
+def delete_business_units(*, session: Session, bu_ids: list[uuid.UUID]) -> None:
+    """
+    Delete business units by ID with a single DELETE.
+
+    Users and file visibility referencing them are cleared first, as the ORM
+    would do on delete. Business units that still have functions can't be
+    deleted.
+    """
+    if not bu_ids:
+        return
+    session.execute(
+        update(User)
+        .where(col(User.business_unit_id).in_(bu_ids))
+        .values(business_unit_id=None),
+        execution_options={"synchronize_session": False},
+    )
+    session.execute(
+        update(File)
+        .where(col(File.visible_bu_id).in_(bu_ids))
+        .values(visible_bu_id=None),
+        execution_options={"synchronize_session": False},
+    )
+    session.execute(
+        delete(BusinessUnit).where(col(BusinessUnit.id).in_(bu_ids)),
+        execution_options={"synchronize_session": False},
+    )
     session.commit()
+
+
+def delete_business_unit(*, session: Session, db_bu: BusinessUnit) -> BusinessUnit:
+    # Load (if expired) and detach first, so the returned object stays usable
+    obj_id = db_bu.id
+    session.expunge(db_bu)
+    delete_business_units(session=session, bu_ids=[obj_id])
     return db_bu
 
 
@@ -165,7 +502,6 @@ def create_function(*, session: Session, func_in: FunctionCreate) -> Function:
     db_obj = Function.model_validate(func_in)
     session.add(db_obj)
     session.commit()
-    session.refresh(db_obj)
     return db_obj
 
 
@@ -173,18 +509,42 @@ def get_function_by_id(*, session: Session, func_id: uuid.UUID) -> Function | No
     return session.get(Function, func_id)
 
 
+def get_function_by_code(
+    *, session: Session, bu_id: uuid.UUID, code: str
+) -> Function | None:
+    statement = select(Function).where(
+        Function.business_unit_id == bu_id, Function.code == code
+    )
+    return session.exec(statement).first()
+
+
+_FUNCTIONS_BY_BU = lambda_stmt(
+    lambda: select(Function)
+    .where(Function.business_unit_id == bindparam("bu_id"))
+    .offset(bindparam("skip"))
+    .limit(bindparam("limit"))
+)
+
+
 def get_functions_by_bu(
     *, session: Session, bu_id: uuid.UUID, skip: int = 0, limit: int = 100
 ) -> list[Function]:
-    statement = select(Function).where(Function.business_unit_id == bu_id).offset(skip).limit(limit)
-    return list(session.exec(statement).all())
+    params = {"bu_id": bu_id, "skip": skip, "limit": limit}
+    return list(session.execute(_FUNCTIONS_BY_BU, params).scalars().all())
+
+
+_FUNCTIONS = lambda_stmt(
+    lambda: select(Function).offset(bindparam("skip")).limit(bindparam("limit"))
+)
 
 
 def get_functions(
     *, session: Session, skip: int = 0, limit: int = 100
 ) -> list[Function]:
-    statement = select(Function).offset(skip).limit(limit)
-    return list(session.exec(statement).all())
+    params = {"skip": skip, "limit": limit}
+    return list(session.execute(_FUNCTIONS, params).scalars().all())
+
+
 
 
 def update_function(
@@ -194,13 +554,51 @@ def update_function(
     db_func.sqlmodel_update(func_data)
     session.add(db_func)
     session.commit()
-    session.refresh(db_func)
     return db_func
 
 
-def delete_function(*, session: Session, db_func: Function) -> Function:
-    session.delete(db_func)
+# Removes the given function IDs from the files' denormalized visibility
+_REMOVE_VISIBLE_FUNCTION_IDS = text(
+    "UPDATE file SET visible_function_ids = ARRAY("
+    "SELECT f FROM unnest(visible_function_ids) AS f WHERE f <> ALL(:ids)"
+    ") WHERE visible_function_ids && :ids"
+).bindparams(bindparam("ids", type_=ARRAY(Uuid)))
+
+
+def delete_functions(*, session: Session, func_ids: list[uuid.UUID]) -> None:
+    """
+    Delete functions by ID with a single DELETE.
+
+    Users and files referencing them are cleared first, as the ORM would do
+    on delete; their file links are removed by ON DELETE CASCADE.
+    """
+    if not func_ids:
+        return
+    session.execute(
+        update(User)
+        .where(col(User.function_id).in_(func_ids))
+        .values(function_id=None),
+        execution_options={"synchronize_session": False},
+    )
+    session.execute(
+        update(File)
+        .where(col(File.responsible_function_id).in_(func_ids))
+        .values(responsible_function_id=None),
+        execution_options={"synchronize_session": False},
+    )
+    session.execute(_REMOVE_VISIBLE_FUNCTION_IDS, {"ids": func_ids})
+    session.execute(
+        delete(Function).where(col(Function.id).in_(func_ids)),
+        execution_options={"synchronize_session": False},
+    )
     session.commit()
+
+
+def delete_function(*, session: Session, db_func: Function) -> Function:
+    # Load (if expired) and detach first, so the returned object stays usable
+    obj_id = db_func.id
+    session.expunge(db_func)
+    delete_functions(session=session, func_ids=[obj_id])
     return db_func
 
 
@@ -224,7 +622,7 @@ def check_file_access(*, session: Session, file: File, user: User) -> bool:
         return True
 
     # If no restrictions, allow access
-    if not file.visible_bu_id and not file.visible_functions:
+    if not file.visible_bu_id and not file.visible_function_ids:
         return True
 
     # Check BU visibility
@@ -232,9 +630,7 @@ def check_file_access(*, session: Session, file: File, user: User) -> bool:
         return True
 
     # Check Function visibility
-    if file.visible_functions and user.function_id:
-        file_function_ids = [f.id for f in file.visible_functions]
-        if user.function_id in file_function_ids:
-            return True
+    if user.function_id and user.function_id in file.visible_function_ids:
+        return True
 
     return False
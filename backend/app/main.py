@@ -1,4 +1,7 @@
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 import sentry_sdk
 from fastapi import FastAPI
 from fastapi.routing import APIRoute
@@ -15,6 +18,25 @@ def custom_generate_unique_id(route: APIRoute) -> str:
     return f"{route.tags[0]}-{route.name}"
 
 
+@asynccontextmanager
+async def lifespan(application: FastAPI) -> AsyncIterator[None]:
+    """Initialize services on startup."""
+    # Pydantic builds validators and serializers when the models are defined,
+    # but JSON schemas only on demand; generate the OpenAPI schema (which
+    # covers every request and response model) now, not on the first request
+    application.openapi()
+
+    # Ensure MinIO bucket exists
+    try:
+        # Access the client property to trigger lazy initialization and bucket creation
+        _ = minio_client.client
+        logger.info(f"MinIO bucket '{minio_client.bucket_name}' is ready")
+    except Exception as e:
+        logger.error(f"Failed to initialize MinIO bucket: {e}")
+        # Don't fail startup - MinIO will retry on first access
+    yield
+
+
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
@@ -22,6 +44,7 @@ app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    lifespan=lifespan,
 )
 
 # Set all CORS enabled origins
@@ -35,18 +58,3 @@ if settings.all_cors_origins:
     )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
-
-
-@app.on_event("startup")
-async def startup_event() -> None:
-    """Initialize services on startup."""
-    # Ensure MinIO bucket exists
-    try:
-        # Access the client property to trigger lazy initialization and bucket creation
-        _ = minio_client.client
-        logger.info(f"MinIO bucket '{minio_client.bucket_name}' is ready")
-    except Exception as e:
-        logger.error(f"Failed to initialize MinIO bucket: {e}")
-        # Don't fail startup - MinIO will retry on first access
-
-
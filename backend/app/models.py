@@ -2,7 +2,8 @@ import uuid
 from datetime import datetime, timezone
 
 from pydantic import EmailStr
-from sqlalchemy import DateTime
+from sqlalchemy import DateTime, Index, UniqueConstraint, Uuid, text
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlmodel import Field, Relationship, SQLModel
 
 
@@ -158,6 +159,11 @@ class BusinessUnitUpdate(SQLModel):
 
 
 class BusinessUnit(BusinessUnitBase, table=True):
+    # Serves the active-only listing shown to non-superusers
+    __table_args__ = (
+        Index("ix_bu_active", "name", postgresql_where=text("is_active")),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     created_at: datetime | None = Field(default_factory=get_datetime_utc)
     users: list["User"] = Relationship(back_populates="business_unit")
@@ -173,6 +179,8 @@ class BusinessUnitPublic(BusinessUnitBase):
 class BusinessUnitsPublic(SQLModel):
     data: list[BusinessUnitPublic]
     count: int
+    # Whether count is the planner's estimate rather than an exact count
+    is_approximate: bool = False
 
 
 # Function models
@@ -197,6 +205,14 @@ class FunctionUpdate(SQLModel):
 
 
 class Function(FunctionBase, table=True):
+    __table_args__ = (
+        # Function codes are unique within their business unit
+        UniqueConstraint("business_unit_id", "code", name="uq_function_bu_code"),
+        Index("ix_function_bu_active", "business_unit_id", "is_active"),
+        # Serves the active-only listing shown to non-superusers
+        Index("ix_function_active", "name", postgresql_where=text("is_active")),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     created_at: datetime | None = Field(default_factory=get_datetime_utc)
     business_unit: BusinessUnit = Relationship(back_populates="functions")
@@ -213,6 +229,8 @@ class FunctionPublic(FunctionBase):
 class FunctionsPublic(SQLModel):
     data: list[FunctionPublic]
     count: int
+    # Whether count is the planner's estimate rather than an exact count
+    is_approximate: bool = False
 
 
 # FileFunctionLink - Association table for File <-> Function many-to-many
@@ -236,7 +254,12 @@ class FileBase(SQLModel):
     original_filename: str = Field(max_length=255)
     content_type: str = Field(max_length=100)
     file_size: int
-    responsible_function_id: uuid.UUID | None = Field(default=None, foreign_key="function.id")
+    responsible_function_id: uuid.UUID | None = Field(
+        default=None, foreign_key="function.id", index=True
+    )
+    # Upload state: "pending" until a presigned upload is completed,
+    # "uploading" while an async upload is stored, then "ready"
+    status: str = Field(default="ready", max_length=20)
 
 
 class FileCreate(SQLModel):
@@ -249,12 +272,33 @@ class FileCreate(SQLModel):
     visible_function_ids: list[uuid.UUID] | None = None
 
 
+# Properties to receive when requesting a presigned upload
+class FileUploadRequest(SQLModel):
+    original_filename: str = Field(min_length=1, max_length=255)
+    content_type: str = Field(default="application/octet-stream", max_length=100)
+    responsible_function_id: uuid.UUID | None = None
+    visible_bu_id: uuid.UUID | None = None
+    visible_function_ids: list[uuid.UUID] | None = None
+
+
 class FileUpdate(SQLModel):
     filename: str | None = Field(default=None, max_length=255)
 
 
 # Database model
 class File(FileBase, table=True):
+    __table_args__ = (
+        # Support keyset pagination ordered by (created_at DESC, id DESC),
+        # across all files and per owner
+        Index("ix_file_created_at_id", "created_at", "id"),
+        Index("ix_file_owner_created", "owner_id", "created_at", "id"),
+        Index(
+            "ix_file_visible_function_ids",
+            "visible_function_ids",
+            postgresql_using="gin",
+        ),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     created_at: datetime | None = Field(
         default_factory=get_datetime_utc,
@@ -263,7 +307,17 @@ class File(FileBase, table=True):
     owner_id: uuid.UUID = Field(
         foreign_key="user.id", nullable=False, ondelete="CASCADE"
     )
-    visible_bu_id: uuid.UUID | None = Field(default=None, foreign_key="businessunit.id")
+    visible_bu_id: uuid.UUID | None = Field(
+        default=None, foreign_key="businessunit.id", index=True
+    )
+    # Copy of the FileFunctionLink rows, so permission checks need no join.
+    # The link table stays the source of truth and both are written together
+    visible_function_ids: list[uuid.UUID] = Field(
+        default_factory=list,
+        sa_type=ARRAY(Uuid),  # type: ignore
+        nullable=False,
+        sa_column_kwargs={"server_default": text("'{}'")},
+    )
     owner: User | None = Relationship(back_populates="files")
     responsible_function: "Function" = Relationship(back_populates="files_uploaded")
     visible_bu: "BusinessUnit" = Relationship(back_populates="files_visible")
@@ -278,6 +332,20 @@ class FilePublic(FileBase):
     created_at: datetime | None = None
 
 
+class FilePresignedUpload(SQLModel):
+    file: FilePublic
+    upload_url: str
+    expires_in: int
+
+
+class FileStatusPublic(SQLModel):
+    id: uuid.UUID
+    status: str
+
+
 class FilesPublic(SQLModel):
     data: list[FilePublic]
     count: int
+    # Whether count is the planner's estimate rather than an exact count
+    is_approximate: bool = False
+    next_cursor: str | None = None
@@ -0,0 +1,250 @@
+import uuid
+from datetime import timedelta
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, col, func, select
+
+from app import crud
+from app.api.routes.files import PENDING_UPLOAD_MAX_AGE, staging_object_name
+from app.core.config import settings
+from app.core.minio import ObjectNotFoundError
+from app.models import File, FileCreate, UserCreate, get_datetime_utc
+from tests.utils.file import create_random_file
+from tests.utils.organization import create_random_function
+from tests.utils.user import user_authentication_headers
+from tests.utils.utils import random_email, random_lower_string
+
+
+def test_upload_files_batch(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    function = create_random_function(db)
+    with patch("app.api.routes.files.minio_client.upload_file") as upload_file:
+        r = client.post(
+            f"{settings.API_V1_STR}/files/upload-batch",
+            headers=normal_user_token_headers,
+            params={"visible_function_ids": str(function.id)},
+            files=[
+                ("files", ("a.txt", b"aaa", "text/plain")),
+                ("files", ("b.txt", b"bb", "text/plain")),
+            ],
+        )
+    assert r.status_code == 200
+    content = r.json()
+    assert content["count"] == 2
+    assert [f["original_filename"] for f in content["data"]] == ["a.txt", "b.txt"]
+    assert [f["file_size"] for f in content["data"]] == [3, 2]
+    assert upload_file.call_count == 2
+    for f in content["data"]:
+        db_file = crud.get_file_by_id(session=db, file_id=uuid.UUID(f["id"]))
+        assert db_file
+        assert db_file.visible_function_ids == [function.id]
+
+
+def test_upload_files_batch_removes_stored_files_on_failure(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    count_statement = select(func.count()).select_from(File)
+    files_before = db.exec(count_statement).one()
+    with (
+        patch(
+            "app.api.routes.files.minio_client.upload_file",
+            side_effect=[None, RuntimeError("Failed to upload file")],
+        ) as upload_file,
+        patch("app.api.routes.files.minio_client.delete_file") as delete_file,
+    ):
+        r = client.post(
+            f"{settings.API_V1_STR}/files/upload-batch",
+            headers=normal_user_token_headers,
+            files=[
+                ("files", ("a.txt", b"aaa", "text/plain")),
+                ("files", ("b.txt", b"bb", "text/plain")),
+            ],
+        )
+    assert r.status_code == 500
+    first_name = upload_file.call_args_list[0].kwargs["filename"]
+    delete_file.assert_called_once_with(first_name)
+    assert db.exec(count_statement).one() == files_before
+    assert not db.exec(select(File).where(col(File.filename) == first_name)).first()
+
+
+def test_get_file_url_rejects_invalid_expiry(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    file = create_random_file(db)
+    for expires_in in (0, 7 * 24 * 3600 + 1):
+        r = client.get(
+            f"{settings.API_V1_STR}/files/{file.id}/url",
+            headers=superuser_token_headers,
+            params={"expires_in": expires_in},
+        )
+        assert r.status_code == 422
+
+
+def test_read_files_cursor_pages(client: TestClient, db: Session) -> None:
+    email, password = random_email(), random_lower_string()
+    user = crud.create_user(
+        session=db, user_create=UserCreate(email=email, password=password)
+    )
+    file_ids = {
+        crud.create_file(
+            session=db,
+            file_in=FileCreate(
+                filename=f"{user.id}/{random_lower_string()}.txt",
+                original_filename=f"{random_lower_string()}.txt",
+                content_type="text/plain",
+                file_size=0,
+            ),
+            owner_id=user.id,
+        ).id
+        for _ in range(3)
+    }
+    headers = user_authentication_headers(client=client, email=email, password=password)
+
+    r = client.get(
+        f"{settings.API_V1_STR}/files/", headers=headers, params={"limit": 2}
+    )
+    assert r.status_code == 200
+    first_page = r.json()
+    assert len(first_page["data"]) == 2
+    assert first_page["count"] == 3
+    assert first_page["next_cursor"]
+
+    r = client.get(
+        f"{settings.API_V1_STR}/files/",
+        headers=headers,
+        params={"limit": 2, "cursor": first_page["next_cursor"]},
+    )
+    assert r.status_code == 200
+    second_page = r.json()
+    assert len(second_page["data"]) == 1
+    assert second_page["count"] == 3
+    assert second_page["next_cursor"] is None
+
+    page_ids = [f["id"] for f in first_page["data"] + second_page["data"]]
+    assert sorted(page_ids) == sorted(str(file_id) for file_id in file_ids)
+
+
+def test_read_files_invalid_cursor(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/files/",
+        headers=normal_user_token_headers,
+        params={"cursor": "not-a-cursor"},
+    )
+    assert r.status_code == 422
+    assert r.json()["detail"] == "Invalid cursor"
+
+
+def create_presigned_upload(
+    client: TestClient, headers: dict[str, str]
+) -> dict[str, str]:
+    with patch(
+        "app.api.routes.files.minio_client.get_upload_url",
+        return_value="http://minio.example.com/upload",
+    ) as get_upload_url:
+        r = client.post(
+            f"{settings.API_V1_STR}/files/presign-upload",
+            headers=headers,
+            json={"original_filename": "report.pdf", "content_type": "application/pdf"},
+        )
+    assert r.status_code == 200
+    content = r.json()
+    assert content["upload_url"] == "http://minio.example.com/upload"
+    file = content["file"]
+    # The URL writes to the staging object, not the final one
+    assert get_upload_url.call_args.args[0] == staging_object_name(file["filename"])
+    return file
+
+
+def test_presigned_upload_complete(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    file = create_presigned_upload(client, normal_user_token_headers)
+    assert file["status"] == "pending"
+    r = client.get(
+        f"{settings.API_V1_STR}/files/{file['id']}/status",
+        headers=normal_user_token_headers,
+    )
+    assert r.status_code == 200
+    assert r.json()["status"] == "pending"
+
+    staging_name = staging_object_name(file["filename"])
+    with (
+        patch("app.api.routes.files.minio_client.copy_file") as copy_file,
+        patch(
+            "app.api.routes.files.minio_client.stat",
+            return_value={
+                "size": 42,
+                "etag": "etag",
+                "content_type": "application/pdf",
+            },
+        ),
+        patch("app.api.routes.files.minio_client.delete_file") as delete_file,
+    ):
+        r = client.post(
+            f"{settings.API_V1_STR}/files/{file['id']}/complete",
+            headers=normal_user_token_headers,
+        )
+    assert r.status_code == 200
+    content = r.json()
+    assert content["status"] == "ready"
+    assert content["file_size"] == 42
+    copy_file.assert_called_once_with(staging_name, file["filename"])
+    delete_file.assert_called_once_with(staging_name)
+
+    r = client.get(
+        f"{settings.API_V1_STR}/files/{file['id']}/status",
+        headers=normal_user_token_headers,
+    )
+    assert r.json()["status"] == "ready"
+
+    r = client.post(
+        f"{settings.API_V1_STR}/files/{file['id']}/complete",
+        headers=normal_user_token_headers,
+    )
+    assert r.status_code == 409
+    assert r.json()["detail"] == "File upload is already complete"
+
+
+def test_presigned_upload_complete_without_content(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    file = create_presigned_upload(client, normal_user_token_headers)
+    with patch(
+        "app.api.routes.files.minio_client.copy_file",
+        side_effect=ObjectNotFoundError("File not found"),
+    ):
+        r = client.post(
+            f"{settings.API_V1_STR}/files/{file['id']}/complete",
+            headers=normal_user_token_headers,
+        )
+    assert r.status_code == 409
+    assert r.json()["detail"] == "File content has not been uploaded yet"
+
+    r = client.get(
+        f"{settings.API_V1_STR}/files/{file['id']}/status",
+        headers=normal_user_token_headers,
+    )
+    assert r.json()["status"] == "pending"
+
+
+def test_presign_upload_removes_expired_uploads(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    expired = create_presigned_upload(client, normal_user_token_headers)
+    db_file = crud.get_file_by_id(session=db, file_id=uuid.UUID(expired["id"]))
+    assert db_file
+    db_file.created_at = get_datetime_utc() - timedelta(
+        seconds=PENDING_UPLOAD_MAX_AGE + 60
+    )
+    db.add(db_file)
+    db.commit()
+
+    with patch("app.api.routes.files.minio_client.delete_file") as delete_file:
+        create_presigned_upload(client, normal_user_token_headers)
+    delete_file.assert_any_call(staging_object_name(expired["filename"]))
+    db.expire_all()
+    assert crud.get_file_by_id(session=db, file_id=uuid.UUID(expired["id"])) is None
@@ -0,0 +1,81 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.models import FunctionUpdate
+from tests.utils.organization import (
+    create_random_business_unit,
+    create_random_function,
+)
+
+
+def test_read_functions_by_business_unit_count(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    bu = create_random_business_unit(db)
+    functions = [create_random_function(db, business_unit_id=bu.id) for _ in range(3)]
+    # Functions of other business units are not counted
+    create_random_function(db)
+    r = client.get(
+        f"{settings.API_V1_STR}/functions/",
+        headers=superuser_token_headers,
+        params={"business_unit_id": str(bu.id), "limit": 2},
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert content["count"] == 3
+    assert content["is_approximate"] is False
+    assert len(content["data"]) == 2
+    assert {f["id"] for f in content["data"]} <= {str(f.id) for f in functions}
+
+    # Past the last page the total is still reported
+    r = client.get(
+        f"{settings.API_V1_STR}/functions/",
+        headers=superuser_token_headers,
+        params={"business_unit_id": str(bu.id), "skip": 5},
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert content["count"] == 3
+    assert content["data"] == []
+
+
+def test_read_functions_by_business_unit_hides_inactive(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    bu = create_random_business_unit(db)
+    active = create_random_function(db, business_unit_id=bu.id)
+    inactive = create_random_function(db, business_unit_id=bu.id)
+    crud.update_function(
+        session=db, db_func=inactive, func_in=FunctionUpdate(is_active=False)
+    )
+    r = client.get(
+        f"{settings.API_V1_STR}/functions/",
+        headers=normal_user_token_headers,
+        params={"business_unit_id": str(bu.id)},
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert [f["id"] for f in content["data"]] == [str(active.id)]
+    assert content["count"] == 1
+
+
+def test_read_functions_by_business_unit_superuser_sees_inactive(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    bu = create_random_business_unit(db)
+    active = create_random_function(db, business_unit_id=bu.id)
+    inactive = create_random_function(db, business_unit_id=bu.id)
+    crud.update_function(
+        session=db, db_func=inactive, func_in=FunctionUpdate(is_active=False)
+    )
+    r = client.get(
+        f"{settings.API_V1_STR}/functions/",
+        headers=superuser_token_headers,
+        params={"business_unit_id": str(bu.id)},
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert {f["id"] for f in content["data"]} == {str(active.id), str(inactive.id)}
+    assert content["count"] == 2
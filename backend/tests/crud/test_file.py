@@ -0,0 +1,247 @@
+from sqlmodel import Session, select
+
+from app import crud
+from app.models import (
+    BusinessUnit,
+    File,
+    FileCreate,
+    FileFunctionLink,
+    User,
+)
+from tests.utils.file import create_random_file
+from tests.utils.organization import (
+    create_random_business_unit,
+    create_random_function,
+)
+from tests.utils.user import create_random_user
+from tests.utils.utils import random_lower_string
+
+
+def test_get_file_by_id(db: Session) -> None:
+    file = create_random_file(db)
+    file_id = file.id
+    # Make sure the file is loaded from the database
+    db.expunge(file)
+    db_file = crud.get_file_by_id(session=db, file_id=file_id)
+    assert db_file
+    assert db_file.id == file_id
+    assert db_file.visible_function_ids == []
+
+
+def test_get_files_by_owner(db: Session) -> None:
+    file = create_random_file(db)
+    files = crud.get_files_by_owner(session=db, owner_id=file.owner_id)
+    assert [f.id for f in files] == [file.id]
+
+
+def test_get_files_by_owner_keyset(db: Session) -> None:
+    file = create_random_file(db)
+    for _ in range(2):
+        crud.create_file(
+            session=db,
+            file_in=FileCreate(
+                filename=f"{file.owner_id}/{random_lower_string()}.txt",
+                original_filename=f"{random_lower_string()}.txt",
+                content_type="text/plain",
+                file_size=0,
+            ),
+            owner_id=file.owner_id,
+        )
+    first_page, cursor = crud.get_files_by_owner_keyset(
+        session=db, owner_id=file.owner_id, limit=2
+    )
+    assert len(first_page) == 2
+    assert cursor == (first_page[-1].created_at, first_page[-1].id)
+    second_page, cursor = crud.get_files_by_owner_keyset(
+        session=db, owner_id=file.owner_id, cursor=cursor, limit=2
+    )
+    assert len(second_page) == 1
+    assert cursor is None
+    page_ids = {f.id for f in first_page + second_page}
+    assert len(page_ids) == 3
+    assert file.id in page_ids
+
+
+def test_bulk_create_files(db: Session) -> None:
+    user = create_random_user(db)
+    function = create_random_function(db)
+    files_in = [
+        FileCreate(
+            filename=f"{user.id}/{random_lower_string()}.txt",
+            original_filename=f"{random_lower_string()}.txt",
+            content_type="text/plain",
+            file_size=i,
+            visible_function_ids=[function.id],
+        )
+        for i in range(3)
+    ]
+    file_ids = crud.bulk_create_files(session=db, files_in=files_in, owner_id=user.id)
+    assert len(file_ids) == 3
+    for file_id, file_in in zip(file_ids, files_in, strict=True):
+        db_file = crud.get_file_by_id(session=db, file_id=file_id)
+        assert db_file
+        assert db_file.owner_id == user.id
+        assert db_file.file_size == file_in.file_size
+        assert db_file.visible_function_ids == [function.id]
+        links = db.exec(
+            select(FileFunctionLink).where(FileFunctionLink.file_id == file_id)
+        ).all()
+        assert [link.function_id for link in links] == [function.id]
+
+
+def test_get_file_for_user_owner(db: Session) -> None:
+    file = create_random_file(db)
+    owner = db.get(User, file.owner_id)
+    assert owner
+    db_file = crud.get_file_for_user(session=db, file_id=file.id, user=owner)
+    assert db_file
+    assert db_file.id == file.id
+
+
+def test_get_file_for_user_unrestricted(db: Session) -> None:
+    file = create_random_file(db)
+    user = create_random_user(db)
+    db_file = crud.get_file_for_user(session=db, file_id=file.id, user=user)
+    assert db_file
+    assert db_file.id == file.id
+
+
+def test_get_file_for_user_restricted_to_other_bu(db: Session) -> None:
+    file = create_random_file(db)
+    bu = create_random_business_unit(db)
+    file.visible_bu_id = bu.id
+    db.add(file)
+    db.commit()
+    user = create_random_user(db)
+    assert crud.get_file_for_user(session=db, file_id=file.id, user=user) is None
+
+    user.business_unit_id = bu.id
+    db.add(user)
+    db.commit()
+    db_file = crud.get_file_for_user(session=db, file_id=file.id, user=user)
+    assert db_file
+    assert db_file.id == file.id
+
+
+def test_get_estimated_count_small_table(db: Session) -> None:
+    create_random_file(db)
+    assert crud.get_estimated_count(session=db, model=File) is None
+
+
+def test_get_files_count_by_owner(db: Session) -> None:
+    file = create_random_file(db)
+    count = crud.get_files_count_by_owner(session=db, owner_id=file.owner_id)
+    assert count == 1
+
+
+def test_get_files_count_by_owner_skips_pending(db: Session) -> None:
+    file = create_random_file(db)
+    file.status = "pending"
+    db.add(file)
+    db.commit()
+    count = crud.get_files_count_by_owner(session=db, owner_id=file.owner_id)
+    assert count == 0
+
+
+def test_check_file_access_by_function(db: Session) -> None:
+    function = create_random_function(db)
+    owner = create_random_user(db)
+    file = crud.create_file(
+        session=db,
+        file_in=FileCreate(
+            filename=f"{owner.id}/{random_lower_string()}.txt",
+            original_filename=f"{random_lower_string()}.txt",
+            content_type="text/plain",
+            file_size=0,
+            visible_function_ids=[function.id],
+        ),
+        owner_id=owner.id,
+    )
+    user = create_random_user(db)
+    db_file = crud.get_file_by_id(session=db, file_id=file.id)
+    assert db_file
+    assert not crud.check_file_access(session=db, file=db_file, user=user)
+    assert not crud.get_file_for_user(session=db, file_id=file.id, user=user)
+
+    user.function_id = function.id
+    db.add(user)
+    db.commit()
+    assert crud.check_file_access(session=db, file=db_file, user=user)
+    assert crud.get_file_for_user(session=db, file_id=file.id, user=user)
+
+
+def test_delete_function_clears_file_visibility(db: Session) -> None:
+    function = create_random_function(db)
+    owner = create_random_user(db)
+    file = crud.create_file(
+        session=db,
+        file_in=FileCreate(
+            filename=f"{owner.id}/{random_lower_string()}.txt",
+            original_filename=f"{random_lower_string()}.txt",
+            content_type="text/plain",
+            file_size=0,
+            responsible_function_id=function.id,
+            visible_function_ids=[function.id],
+        ),
+        owner_id=owner.id,
+    )
+    deleted = crud.delete_function(session=db, db_func=function)
+    assert deleted.id == function.id
+    assert crud.get_function_by_id(session=db, func_id=function.id) is None
+    db.refresh(file)
+    assert file.responsible_function_id is None
+    assert file.visible_function_ids == []
+    links = db.exec(
+        select(FileFunctionLink).where(FileFunctionLink.file_id == file.id)
+    ).all()
+    assert links == []
+
+
+def test_delete_files(db: Session) -> None:
+    function = create_random_function(db)
+    owner = create_random_user(db)
+    files_in = [
+        FileCreate(
+            filename=f"{owner.id}/{random_lower_string()}.txt",
+            original_filename=f"{random_lower_string()}.txt",
+            content_type="text/plain",
+            file_size=0,
+            visible_function_ids=[function.id],
+        )
+        for _ in range(3)
+    ]
+    file_ids = crud.bulk_create_files(session=db, files_in=files_in, owner_id=owner.id)
+    crud.delete_files(session=db, file_ids=file_ids[:2])
+    for file_id in file_ids[:2]:
+        assert crud.get_file_by_id(session=db, file_id=file_id) is None
+    assert crud.get_file_by_id(session=db, file_id=file_ids[2])
+    links = db.exec(
+        select(FileFunctionLink).where(FileFunctionLink.function_id == function.id)
+    ).all()
+    assert [link.file_id for link in links] == [file_ids[2]]
+
+
+def test_delete_business_units_clears_references(db: Session) -> None:
+    bu = create_random_business_unit(db)
+    other_bu = create_random_business_unit(db)
+    user = create_random_user(db)
+    user.business_unit_id = bu.id
+    db.add(user)
+    file = create_random_file(db)
+    file.visible_bu_id = bu.id
+    db.add(file)
+    other_file = create_random_file(db)
+    other_file.visible_bu_id = other_bu.id
+    db.add(other_file)
+    db.commit()
+
+    bu_id = bu.id
+    crud.delete_business_units(session=db, bu_ids=[bu_id])
+    assert db.get(BusinessUnit, bu_id) is None
+    assert db.get(BusinessUnit, other_bu.id)
+    db.refresh(user)
+    db.refresh(file)
+    db.refresh(other_file)
+    assert user.business_unit_id is None
+    assert file.visible_bu_id is None
+    assert other_file.visible_bu_id == other_bu.id
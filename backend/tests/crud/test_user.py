@@ -34,6 +34,17 @@ def test_not_authenticate_user(db: Session) -> None:
     assert user is None
 
 
+def test_not_authenticate_user_verifies_dummy_hash_until_calibrated(
+    db: Session,
+) -> None:
+    crud._verify_durations.clear()
+    for _ in range(crud.MIN_VERIFY_DURATION_SAMPLES):
+        crud.authenticate(
+            session=db, email=random_email(), password=random_lower_string()
+        )
+    assert len(crud._verify_durations) == crud.MIN_VERIFY_DURATION_SAMPLES
+
+
 def test_check_if_user_is_active(db: Session) -> None:
     email = random_email()
     password = random_lower_string()
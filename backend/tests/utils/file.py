@@ -0,0 +1,20 @@
+from sqlmodel import Session
+
+from app import crud
+from app.models import File, FileCreate
+from tests.utils.user import create_random_user
+from tests.utils.utils import random_lower_string
+
+
+def create_random_file(db: Session) -> File:
+    user = create_random_user(db)
+    owner_id = user.id
+    assert owner_id is not None
+    filename = f"{owner_id}/{random_lower_string()}.txt"
+    file_in = FileCreate(
+        filename=filename,
+        original_filename=f"{random_lower_string()}.txt",
+        content_type="text/plain",
+        file_size=0,
+    )
+    return crud.create_file(session=db, file_in=file_in, owner_id=owner_id)
@@ -0,0 +1,27 @@
+import uuid
+
+from sqlmodel import Session
+
+from app import crud
+from app.models import BusinessUnit, BusinessUnitCreate, Function, FunctionCreate
+from tests.utils.utils import random_lower_string
+
+
+def create_random_business_unit(db: Session) -> BusinessUnit:
+    bu_in = BusinessUnitCreate(
+        name=random_lower_string(), code=random_lower_string()[:50]
+    )
+    return crud.create_business_unit(session=db, bu_in=bu_in)
+
+
+def create_random_function(
+    db: Session, business_unit_id: uuid.UUID | None = None
+) -> Function:
+    if business_unit_id is None:
+        business_unit_id = create_random_business_unit(db).id
+    func_in = FunctionCreate(
+        name=random_lower_string(),
+        code=random_lower_string()[:50],
+        business_unit_id=business_unit_id,
+    )
+    return crud.create_function(session=db, func_in=func_in)